@@ -93,8 +93,9 @@ def _send_hook_notification(hook_input, hook_event_name):
         sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         try:
             sock.connect(str(socket_path))
-            # Send data for notification
-            sock.sendall(json.dumps(hook_input).encode("utf-8"))
+            # Send data for notification, newline-terminated so the server can
+            # tell a complete payload from a truncated one
+            sock.sendall(json.dumps(hook_input).encode("utf-8") + b"\n")
         finally:
             sock.close()
 
@@ -1,5 +1,11 @@
 """Webhook handler for receiving Claude hook events and providing live status updates."""
 
+import asyncio
+import hashlib
+import json
+import re
+import time
+
 from typing import Any, Dict, Optional
 
 import structlog
@@ -9,7 +15,7 @@ from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.constants import ParseMode
 from telegram.helpers import escape_markdown
 
-from ...claude.permission_monitor import permission_monitor
+from ...claude.permission_monitor import get_permission_monitor
 from ...config.settings import Settings
 from ..utils.message_sender import RobustMessageSender
 
@@ -93,9 +99,6 @@ class MessageTracker:
 
     def create_tool_signature(self, tool_name: str, tool_params: Dict[str, Any]) -> str:
         """Create a unique signature for a tool operation based on its parameters."""
-        import hashlib
-        import json
-
         # Create a consistent string representation of the tool and its parameters
         # NOTE: Do NOT include timestamp - pre and post hooks need the same signature
         signature_data = {"tool": tool_name, "params": tool_params}
@@ -116,7 +119,6 @@ class MessageTracker:
         tool_name: str,
     ) -> None:
         """Register a pre_tool operation for later matching with post_tool."""
-        import time
 
         # Create composite key: session_id:tool_name for precise matching
         operation_key = f"{session_id}:{tool_name}"
@@ -183,7 +185,6 @@ class MessageTracker:
 
     def cleanup_old_operations(self, max_age_seconds: int = 600) -> None:
         """Clean up tool operations older than max_age_seconds (default 10 minutes)."""
-        import time
 
         current_time = time.time()
 
@@ -617,7 +618,6 @@ class ConversationWebhookHandler:
                         # If message_id is 0, the pre-tool message might still be sending
                         # Give it a moment to complete
                         if matching_operation.get("message_id", 0) == 0:
-                            import asyncio
 
                             await asyncio.sleep(0.1)  # Brief wait for message_id update
                             # Re-fetch the operation to get updated message_id
@@ -691,7 +691,6 @@ class ConversationWebhookHandler:
 
     def _sanitize_markdown(self, text: str) -> str:
         """Sanitize text to prevent Telegram Markdown parsing errors while preserving formatting."""
-        import re
 
         # Only apply minimal sanitization to prevent parsing errors, not full escaping
         # This preserves intended Markdown formatting while fixing edge cases
@@ -797,7 +796,6 @@ class ConversationWebhookHandler:
 
                 # Small delay between messages to avoid rate limiting
                 if i < len(message_parts) - 1:
-                    import asyncio
 
                     await asyncio.sleep(0.1)
 
@@ -860,7 +858,6 @@ class ConversationWebhookHandler:
 
                 # Small delay between messages to avoid rate limiting
                 if i < len(message_parts) - 1:
-                    import asyncio
 
                     await asyncio.sleep(0.1)
 
@@ -1051,7 +1048,7 @@ class ConversationWebhookHandler:
                 return
 
             # Notify permission monitor that user responded (for simplified dialog tracking)
-            permission_monitor.mark_user_responded(dialog_info["session_id"])
+            get_permission_monitor().mark_user_responded(dialog_info["session_id"])
 
             # Send the response to Claude using the same integration as regular messages
             await self._send_permission_response_to_claude(
@@ -1,12 +1,20 @@
 """Monitor Claude conversation transcripts and relay to Telegram."""
 
 import asyncio
-import json
-
+import difflib
+import functools
+import itertools
+import logging
+import mmap
+import os
+import time
+
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional
 
+import orjson
 import structlog
 
 from ..config.settings import Settings
@@ -14,14 +22,135 @@ from ..config.settings import Settings
 
 logger = structlog.get_logger()
 
+# Sessions whose transcript offsets are remembered; older ones are re-scanned
+# from their last user prompt if they show up again
+MAX_TRACKED_SESSIONS = 128
+
+
+# Monotonic time and ISO string of the last wall clock reading
+_now_iso_cache = [float("-inf"), ""]
+
+
+def _now_iso() -> str:
+    """Return the current local time as ISO text, refreshed every 100ms."""
+    now = time.monotonic()
+    if now - _now_iso_cache[0] > 0.1:
+        _now_iso_cache[:] = [now, datetime.now().isoformat()]
+    return _now_iso_cache[1]
+
+
+def _response_fields(tool_response: Any) -> Dict[str, Any]:
+    """Return a tool response as a dict, or an empty one for other payloads."""
+    return tool_response if isinstance(tool_response, dict) else {}
+
+
+def _truncate(text: str, limit: int, suffix: str = "\n... (truncated)") -> str:
+    """Cut text to limit characters, marking the cut with suffix."""
+    return text if len(text) <= limit else f"{text[:limit]}{suffix}"
+
+
+def _patch_count(tool_response: dict) -> int:
+    """Return the number of structured patches in a tool response."""
+    structured_patch = tool_response.get("structuredPatch")
+    return len(structured_patch) if type(structured_patch) is list else 0
+
+
+# Map common file extensions to Telegram-supported language identifiers
+_EXTENSION_MAP = {
+    ".py": "python",
+    ".js": "javascript",
+    ".ts": "typescript",
+    ".jsx": "jsx",
+    ".tsx": "tsx",
+    ".java": "java",
+    ".c": "c",
+    ".cpp": "cpp",
+    ".cc": "cpp",
+    ".cxx": "cpp",
+    ".h": "c",
+    ".hpp": "cpp",
+    ".cs": "csharp",
+    ".go": "go",
+    ".rs": "rust",
+    ".php": "php",
+    ".rb": "ruby",
+    ".sh": "bash",
+    ".bash": "bash",
+    ".zsh": "bash",
+    ".fish": "bash",
+    ".ps1": "powershell",
+    ".sql": "sql",
+    ".html": "html",
+    ".css": "css",
+    ".scss": "scss",
+    ".sass": "sass",
+    ".json": "json",
+    ".xml": "xml",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".toml": "toml",
+    ".ini": "ini",
+    ".cfg": "ini",
+    ".conf": "ini",
+    ".md": "markdown",
+    ".markdown": "markdown",
+    ".dockerfile": "dockerfile",
+    ".makefile": "makefile",
+    ".mk": "makefile",
+}
+
+
+# Status emoji and priority indicator for TodoWrite items
+_TODO_STATUS_EMOJI = {
+    "pending": "⏳",
+    "in_progress": "🔄",
+    "completed": "✅",
+}
+_TODO_PRIORITY_INDICATOR = {
+    "high": " 🔥",
+    "medium": " ⚡",
+}
+
+
+_EXTENSION_LANGUAGE = _EXTENSION_MAP.get
+
+# Transcript entry types that carry relayable messages
+_VALID_TYPES = frozenset({"user", "assistant"})
+
+# Special cases for files without extensions
+_SPECIAL_FILENAMES = frozenset({"dockerfile", "makefile", "vagrantfile", "jenkinsfile"})
+
+
+@functools.lru_cache(maxsize=MAX_TRACKED_SESSIONS)
+def _transcript_file(transcript_path: str) -> Path:
+    """Expand a hook-reported transcript path, bounded like the offsets."""
+    return Path(transcript_path).expanduser()
+
+
+@functools.lru_cache(maxsize=256)
+def _detect_language_cached(path_lower: str) -> str:
+    """Map a lowercased file path to its highlighting language."""
+    filename = os.path.basename(path_lower)
+    if filename in _SPECIAL_FILENAMES:
+        return filename
+
+    return _EXTENSION_LANGUAGE(os.path.splitext(filename)[1], "")
+
 
 class ConversationMonitor:
     """Monitors Claude conversation transcripts and relays messages to Telegram."""
 
+    __slots__ = (
+        "config",
+        "message_callback",
+        "last_processed_offset",
+    )
+
     def __init__(self, config: Settings, message_callback: Optional[Callable] = None):
         self.config = config
         self.message_callback = message_callback
-        self.last_processed_line = {}  # session_id -> last line number
+        # session_id -> bytes already consumed, least recently used first
+        self.last_processed_offset = OrderedDict()
 
     async def process_transcript(self, transcript_path: str, session_id: str) -> None:
         """Process a conversation transcript and send new messages to Telegram."""
@@ -29,13 +158,13 @@ class ConversationMonitor:
             "Processing transcript", path=transcript_path, session_id=session_id
         )
         try:
-            path = Path(transcript_path).expanduser()
-            if not path.exists():
-                logger.warning("Transcript file not found", path=transcript_path)
-                return
+            path = _transcript_file(transcript_path)
 
-            # Get all messages first
+            # Get the messages written since the previous hook for this session
             all_messages = await self._parse_all_messages(path, session_id)
+            if not all_messages:
+                logger.info("No new messages to relay", session_id=session_id)
+                return
 
             # Extract only the messages from the current conversation turn
             current_turn_messages = self._extract_current_turn(all_messages)
@@ -62,77 +191,180 @@ class ConversationMonitor:
     async def _parse_all_messages(
         self, path: Path, session_id: str
     ) -> List[Dict[str, Any]]:
-        """Parse all messages from transcript file."""
+        """Parse all messages from transcript file off the event loop."""
+        # run_in_executor rather than asyncio.to_thread, which needs Python 3.9
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._parse_all_messages_sync, path, session_id
+        )
+
+    def _parse_all_messages_sync(
+        self, path: Path, session_id: str
+    ) -> List[Dict[str, Any]]:
+        """Parse messages appended to the transcript since the last call."""
         messages = []
+        # Checked once per parse rather than per line; logging is configured
+        # at startup, after this module is imported
+        debug = logger.isEnabledFor(logging.DEBUG)
 
         try:
-            with open(path) as f:
-                for line_num, line in enumerate(f, 1):
-                    try:
-                        data = json.loads(line.strip())
-                        message = self._extract_message_data(data)
-                        if message:
-                            messages.append(message)
-                    except json.JSONDecodeError:
-                        logger.debug("Skipping invalid JSON line", line_num=line_num)
+            size = path.stat().st_size
+            offset = self.last_processed_offset.get(session_id)
+            if offset == size or size == 0:
+                # Nothing appended since the last call, or an empty file that
+                # cannot be mapped: skip opening the transcript at all
+                self._remember_offset(session_id, size)
+                return messages
+
+            with open(path, "rb") as f:
+                # Map the file and hand raw line slices to orjson, which parses
+                # bytes directly, so no text decoding layer is involved
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if offset is None or offset > size:
+                        # First look at this session, or the transcript was
+                        # truncated or replaced: only the latest turn is
+                        # relayed, so start there
+                        offset = self._find_last_user_offset(mapped)
 
+                    try:
+                        while True:
+                            line_end = mapped.find(b"\n", offset)
+                            if line_end == -1:
+                                # Line is still being written, pick it up next time
+                                break
+                            line_start = offset
+                            line = mapped[line_start:line_end]
+                            offset = line_end + 1
+
+                            # Only user and assistant entries are relayed, and both
+                            # carry their role as a JSON string token. Lines without
+                            # either (summaries, system events) are skipped unparsed
+                            if b'"user"' not in line and b'"assistant"' not in line:
+                                continue
+                            # Tool results are stored as user entries and dropped by
+                            # _extract_message_data, so reject them before parsing
+                            if b'"tool_result"' in line and b'"type":"user"' in line:
+                                continue
+                            try:
+                                data = orjson.loads(line)
+                                message = self._extract_message_data(data)
+                                if message:
+                                    messages.append(message)
+                            except orjson.JSONDecodeError:
+                                if debug:
+                                    logger.debug(
+                                        "Skipping invalid JSON line", offset=line_start
+                                    )
+                            except Exception as e:
+                                # A malformed entry must not stall the offset, or the
+                                # lines before it would be relayed again every Stop
+                                logger.warning(
+                                    "Skipping unreadable transcript entry",
+                                    offset=line_start,
+                                    error=str(e),
+                                )
+
+                    finally:
+                        # Keep whatever was consumed even if reading stops early
+                        self._remember_offset(session_id, offset)
+
+        except FileNotFoundError:
+            # The stat above doubles as the existence check
+            logger.warning("Transcript file not found", path=str(path))
         except Exception as e:
             logger.error("Error reading transcript", error=str(e))
 
         return messages
 
+    def _remember_offset(self, session_id: str, offset: int) -> None:
+        """Store a session's transcript offset, evicting the least recent."""
+        offsets = self.last_processed_offset
+        offsets[session_id] = offset
+        offsets.move_to_end(session_id)
+        if len(offsets) > MAX_TRACKED_SESSIONS:
+            offsets.popitem(last=False)
+
+    def _find_last_user_offset(self, mapped: mmap.mmap) -> int:
+        """Find the byte offset of the last user prompt in a transcript.
+
+        Scans the mapped file backwards for user entries so earlier turns are
+        never parsed. Tool results are also stored as user entries, so each
+        candidate is checked before it is accepted. Returns 0 if none is found.
+        """
+        end = len(mapped)
+        while True:
+            pos = mapped.rfind(b'"type":"user"', 0, end)
+            if pos == -1:
+                return 0
+
+            line_start = mapped.rfind(b"\n", 0, pos) + 1
+            line_end = mapped.find(b"\n", pos)
+            if line_end == -1:
+                line_end = len(mapped)
+
+            try:
+                data = orjson.loads(mapped[line_start:line_end])
+                message = (
+                    self._extract_message_data(data) if isinstance(data, dict) else None
+                )
+            except Exception:
+                # Invalid JSON or a malformed entry; keep scanning backwards
+                message = None
+
+            if message and message.get("role") == "user":
+                return line_start
+
+            end = line_start
+
     def _extract_current_turn(
         self, messages: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
         """Extract only messages from the current conversation turn.
 
         A conversation turn starts with the last user message and includes
-        all subsequent assistant messages until the end.
+        all subsequent assistant messages until the end. Without a user
+        message, all assistant messages are consolidated.
         """
         if not messages:
             return []
 
-        # Find the last user message
-        last_user_index = -1
-        for i in range(len(messages) - 1, -1, -1):
-            if messages[i].get("role") == "user":
-                last_user_index = i
-                break
-
-        if last_user_index == -1:
-            # No user message found, return all assistant messages
-            return [m for m in messages if m.get("role") == "assistant"]
-
-        # Return all messages from the last user message onwards
-        current_turn = messages[last_user_index:]
-
-        # Filter to only include the last user message and assistant responses
-        # This helps consolidate multiple assistant chunks into meaningful updates
-        result = []
-
-        # Add the user message
-        result.append(current_turn[0])
-
-        # Consolidate assistant messages
+        # Walk backwards from the end, collecting assistant chunks until the
+        # last user message is reached, then restore their original order
+        user_message = None
         assistant_content = []
         assistant_tools = []
+        add_content = assistant_content.append
+        add_tools = assistant_tools.append
 
-        for msg in current_turn[1:]:
-            if msg.get("role") == "assistant":
-                if msg.get("content"):
-                    assistant_content.append(msg["content"])
-                if msg.get("tool_calls"):
-                    assistant_tools.extend(msg["tool_calls"])
+        for msg in reversed(messages):
+            role = msg.get("role")
+            if role == "user":
+                user_message = msg
+                break
+            if role == "assistant":
+                content = msg.get("content")
+                if content:
+                    add_content(content)
+                tool_calls = msg.get("tool_calls")
+                if tool_calls:
+                    add_tools(tool_calls)
+
+        # Keep the user message followed by a single consolidated assistant
+        # message, or only the latter when the turn's prompt was already seen
+        result = [user_message] if user_message is not None else []
 
         # Create a single consolidated assistant message if there's content
         if assistant_content or assistant_tools:
+            assistant_content.reverse()
+            last_msg = messages[-1]
             consolidated_msg = {
                 "type": "message",
                 "role": "assistant",
                 "content": "\n".join(assistant_content),
-                "tool_calls": assistant_tools,
-                "timestamp": current_turn[-1].get("timestamp"),
-                "metadata": current_turn[-1].get("metadata", {}),
+                "tool_calls": [
+                    call for calls in reversed(assistant_tools) for call in calls
+                ],
+                "timestamp": last_msg.get("timestamp"),
+                "metadata": last_msg.get("metadata", {}),
             }
             result.append(consolidated_msg)
 
@@ -144,56 +376,63 @@ class ConversationMonitor:
         # {"type": "user", "message": {"role": "user", "content": "..."}, ...}
         # {"type": "assistant", "message": {"content": [{"type": "text", "text": "..."}]}, ...}
 
-        msg_type = data.get("type")
-        message = data.get("message", {})
+        get = data.get
+        msg_type = get("type")
 
-        logger.debug(
-            "Extracting message", msg_type=msg_type, available_keys=list(data.keys())
-        )
-
-        # Only process user and assistant messages
-        if msg_type not in ["user", "assistant"]:
-            logger.debug("Skipping message type", msg_type=msg_type)
+        # Only process user and assistant messages. This is checked before
+        # anything else since most skipped lines stop here
+        if msg_type not in _VALID_TYPES:
             return None
 
+        message = get("message", {})
+        raw_content = message.get("content")
+
         # Skip tool results (they have type "user" but contain tool_result)
-        if msg_type == "user" and isinstance(message.get("content"), list):
-            content_list = message.get("content", [])
-            if (
-                content_list
-                and isinstance(content_list[0], dict)
-                and content_list[0].get("type") == "tool_result"
-            ):
-                logger.debug("Skipping tool result message")
-                return None
+        if (
+            msg_type == "user"
+            and type(raw_content) is list
+            and raw_content
+            and isinstance(raw_content[0], dict)
+            and raw_content[0].get("type") == "tool_result"
+        ):
+            return None
+
+        # Runs once per transcript line, so skip building debug events
+        # entirely unless debug logging is on
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Extracting message", msg_type=msg_type, key_count=len(data))
 
         # Extract content based on message type
         content = ""
         tool_calls = []
 
         if msg_type == "user":
-            content = message.get("content", "")
-        elif msg_type == "assistant":
+            content = "" if raw_content is None else raw_content
+        elif type(raw_content) is list:
             # Assistant messages have content as array
-            content_array = message.get("content", [])
-            if isinstance(content_array, list):
-                for item in content_array:
-                    if isinstance(item, dict):
-                        if item.get("type") == "text":
-                            content += item.get("text", "")
-                        elif item.get("type") == "tool_use":
-                            tool_calls.append(
-                                {
-                                    "name": item.get("name"),
-                                    "parameters": item.get("input", {}),
-                                }
-                            )
-            elif isinstance(content_array, str):
-                content = content_array
+            text_parts = []
+            for item in raw_content:
+                if type(item) is not dict:
+                    continue
+                item_type = item.get("type")
+                if item_type == "text":
+                    text_parts.append(item.get("text", ""))
+                elif item_type == "tool_use":
+                    tool_calls.append(
+                        {
+                            "name": item.get("name"),
+                            "parameters": item.get("input", {}),
+                        }
+                    )
+            content = "".join(text_parts)
+        elif isinstance(raw_content, str):
+            content = raw_content
 
         # Skip if no text content (could be tool-only message)
         if not content and not tool_calls:
-            logger.debug("No content or tool calls found", msg_type=msg_type)
+            if debug:
+                logger.debug("No content or tool calls found", msg_type=msg_type)
             return None
 
         result = {
@@ -201,37 +440,39 @@ class ConversationMonitor:
             # Use role from message if available
             "role": message.get("role", msg_type),
             "content": content,
-            "timestamp": data.get("timestamp", datetime.now().isoformat()),
+            "timestamp": get("timestamp", _now_iso()),
             "tool_calls": tool_calls,
             "metadata": {
-                "session_id": data.get("sessionId"),
-                "uuid": data.get("uuid"),
-                "request_id": data.get("requestId"),
+                "session_id": get("sessionId"),
+                "uuid": get("uuid"),
+                "request_id": get("requestId"),
             },
         }
 
-        logger.debug(
-            "Extracted message",
-            role=result["role"],
-            has_content=bool(content),
-            tool_count=len(tool_calls),
-        )
+        if debug:
+            logger.debug(
+                "Extracted message",
+                role=result["role"],
+                has_content=bool(content),
+                tool_count=len(tool_calls),
+            )
         return result
 
     async def _relay_to_telegram(
         self, messages: List[Dict[str, Any]], session_id: str
     ) -> None:
-        """Send messages to Telegram via callback."""
+        """Send messages to Telegram via callback, in transcript order."""
         if not self.message_callback:
             logger.debug("No message callback configured, skipping relay")
             return
 
+        now_iso = _now_iso()
         for message in messages:
             try:
                 payload = {
                     "session_id": session_id,
                     "message": message,
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": now_iso,
                 }
 
                 # Call the callback function directly
@@ -250,30 +491,27 @@ class ConversationMonitor:
             formatted_message = self._format_hook_notification(notification)
 
             if formatted_message:
+                now_iso = _now_iso()
+
                 # Include tool information for signature-based matching
                 message_data = {
                     "type": "hook_notification",
                     "role": "system",
                     "content": formatted_message,
-                    "timestamp": notification.get(
-                        "timestamp", datetime.now().isoformat()
-                    ),
+                    "timestamp": notification.get("timestamp", now_iso),
                 }
 
                 # Add tool information for pre/post matching
-                if notification.get("type") in ["pre_tool_use", "post_tool_use"]:
-                    message_data.update(
-                        {
-                            "tool_name": notification.get("tool_name"),
-                            "tool_params": notification.get("parameters", {}),
-                            "notification_type": notification.get("type"),
-                        }
-                    )
+                notification_type = notification.get("type")
+                if notification_type in ["pre_tool_use", "post_tool_use"]:
+                    message_data["tool_name"] = notification.get("tool_name")
+                    message_data["tool_params"] = notification.get("parameters", {})
+                    message_data["notification_type"] = notification_type
 
                 payload = {
                     "session_id": notification.get("session_id", "unknown"),
                     "message": message_data,
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": now_iso,
                 }
 
                 await self.message_callback(payload)
@@ -296,6 +534,7 @@ class ConversationMonitor:
             # Use parsed options from tmux pane or fallback
             options = self._get_permission_options(context)
 
+            now_iso = _now_iso()
             payload = {
                 "session_id": dialog_data.get("session_id", "unknown"),
                 "message": {
@@ -303,12 +542,10 @@ class ConversationMonitor:
                     "role": "system",
                     "content": question,
                     "options": options,
-                    "timestamp": dialog_data.get(
-                        "timestamp", datetime.now().isoformat()
-                    ),
-                    "dialog_id": f"dialog_{datetime.now().timestamp()}",
+                    "timestamp": dialog_data.get("timestamp", now_iso),
+                    "dialog_id": f"dialog_{time.monotonic_ns()}",
                 },
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso,
             }
 
             await self.message_callback(payload)
@@ -400,19 +637,20 @@ class ConversationMonitor:
                     question = "🔐 **Permission Required**\n\nClaude needs permission to edit a file"
             else:
                 # Full version: show all code details
-                question = f"🔐 **Permission Required**\n\n{base_message}"
+                parts = ["🔐 **Permission Required**", base_message]
                 if file_path:
-                    question += f"\n\n📂 **File:** `{file_path}`"
+                    parts.append(f"📂 **File:** `{file_path}`")
                 if code_snippet and new_code:
                     # Create diff showing the changes
                     diff_content = self._create_diff(code_snippet, new_code, file_path)
-                    question += f"\n\n**Changes:**\n```diff\n{diff_content}\n```"
+                    parts.append(f"**Changes:**\n```diff\n{diff_content}\n```")
                 elif code_snippet:
                     # Show code being removed if no new code available
-                    question += f"\n\n**Removing:**\n```{lang}\n{code_snippet}\n```"
+                    parts.append(f"**Removing:**\n```{lang}\n{code_snippet}\n```")
                 elif new_code:
                     # Show code being added if no old code available
-                    question += f"\n\n**Adding:**\n```{lang}\n{new_code}\n```"
+                    parts.append(f"**Adding:**\n```{lang}\n{new_code}\n```")
+                question = "\n\n".join(parts)
 
         elif tool_use == "Write":
             if simplified:
@@ -424,21 +662,23 @@ class ConversationMonitor:
                     question = "🔐 **Permission Required**\n\nClaude needs permission to write a file"
             else:
                 # Full version: show all content details
-                question = f"🔐 **Permission Required**\n\n{base_message}"
+                parts = ["🔐 **Permission Required**", base_message]
                 if file_path:
-                    question += f"\n\n📂 **File:** `{file_path}`"
+                    parts.append(f"📂 **File:** `{file_path}`")
                 if code_snippet:
                     # Show full content, no truncation
-                    question += (
-                        f"\n\n**Content to write:**\n```{lang}\n{code_snippet}\n```"
+                    parts.append(
+                        f"**Content to write:**\n```{lang}\n{code_snippet}\n```"
                     )
+                question = "\n\n".join(parts)
 
         elif tool_use == "Bash":
             # Always show full command for bash (they're short anyway)
-            question = f"🔐 **Permission Required**\n\n{base_message}"
+            parts = ["🔐 **Permission Required**", base_message]
             if code_snippet:
                 # Show full command in code block
-                question += f"\n\n**Command to execute:**\n```bash\n{code_snippet}\n```"
+                parts.append(f"**Command to execute:**\n```bash\n{code_snippet}\n```")
+            question = "\n\n".join(parts)
 
         elif tool_use == "MultiEdit":
             # Get edit count from context if available
@@ -456,9 +696,10 @@ class ConversationMonitor:
                     question = f"🔐 **Permission Required**\n\nClaude needs permission to edit a file ({edit_text})"
             else:
                 # Full version for MultiEdit with edit details
-                question = f"🔐 **Permission Required**\n\n{base_message}"
+                parts = ["🔐 **Permission Required**", base_message]
                 if file_path:
-                    question += f"\n\n📂 **File:** `{file_path}` ({edit_text})"
+                    parts.append(f"📂 **File:** `{file_path}` ({edit_text})")
+                question = "\n\n".join(parts)
 
                 # Note: Removed truncated preview for MultiEdit - full content is available in Pre-tool hook
 
@@ -474,9 +715,9 @@ class ConversationMonitor:
 
         elif tool_use == "Read":
             # Read tool - show file to be read with range info
-            question = f"🔐 **Permission Required**\n\n{base_message}"
+            parts = ["🔐 **Permission Required**", base_message]
             if file_path:
-                question += f"\n\n📂 **File to read:** `{file_path}`"
+                file_line = f"📂 **File to read:** `{file_path}`"
 
                 # Add range information if offset/limit are specified
                 offset = tool_input.get("offset")
@@ -494,15 +735,18 @@ class ConversationMonitor:
                             end_line = (
                                 offset + limit - 1
                             )  # -1 because limit is inclusive
-                            question += f"\n📍 **Range:** Lines {offset}-{end_line}"
+                            file_line += f"\n📍 **Range:** Lines {offset}-{end_line}"
                         elif offset is not None:
-                            question += f"\n📍 **Starting from:** Line {offset}"
+                            file_line += f"\n📍 **Starting from:** Line {offset}"
                         elif limit is not None:
-                            question += f"\n📍 **Limit:** First {limit} lines"
+                            file_line += f"\n📍 **Limit:** First {limit} lines"
                 except (ValueError, TypeError):
                     # If conversion fails, just skip the range info
                     pass
 
+                parts.append(file_line)
+            question = "\n\n".join(parts)
+
         else:
             # Generic tool or unknown
             if simplified:
@@ -517,9 +761,10 @@ class ConversationMonitor:
                     question = f"🔐 **Permission Required**\n\n{base_message}"
             else:
                 # Full context version
-                question = f"🔐 **Permission Required**\n\n{base_message}"
+                parts = ["🔐 **Permission Required**", base_message]
                 if file_path:
-                    question += f"\n\n📂 **File:** `{file_path}`"
+                    parts.append(f"📂 **File:** `{file_path}`")
+                question = "\n\n".join(parts)
 
         return question
 
@@ -528,68 +773,12 @@ class ConversationMonitor:
         if not file_path:
             return ""
 
-        # Map common file extensions to Telegram-supported language identifiers
-        extension_map = {
-            ".py": "python",
-            ".js": "javascript",
-            ".ts": "typescript",
-            ".jsx": "jsx",
-            ".tsx": "tsx",
-            ".java": "java",
-            ".c": "c",
-            ".cpp": "cpp",
-            ".cc": "cpp",
-            ".cxx": "cpp",
-            ".h": "c",
-            ".hpp": "cpp",
-            ".cs": "csharp",
-            ".go": "go",
-            ".rs": "rust",
-            ".php": "php",
-            ".rb": "ruby",
-            ".sh": "bash",
-            ".bash": "bash",
-            ".zsh": "bash",
-            ".fish": "bash",
-            ".ps1": "powershell",
-            ".sql": "sql",
-            ".html": "html",
-            ".css": "css",
-            ".scss": "scss",
-            ".sass": "sass",
-            ".json": "json",
-            ".xml": "xml",
-            ".yaml": "yaml",
-            ".yml": "yaml",
-            ".toml": "toml",
-            ".ini": "ini",
-            ".cfg": "ini",
-            ".conf": "ini",
-            ".md": "markdown",
-            ".markdown": "markdown",
-            ".dockerfile": "dockerfile",
-            ".makefile": "makefile",
-            ".mk": "makefile",
-        }
-
-        # Get file extension
-        import os
-
-        _, ext = os.path.splitext(file_path.lower())
-
-        # Special cases for files without extensions
-        filename = os.path.basename(file_path.lower())
-        if filename in ["dockerfile", "makefile", "vagrantfile", "jenkinsfile"]:
-            return filename
-
-        return extension_map.get(ext, "")
+        return _detect_language_cached(file_path.lower())
 
     def _create_diff(
         self, old_string: str, new_string: str, file_path: str = ""
     ) -> str:
         """Create a unified diff between old and new strings."""
-        import difflib
-
         # Split strings into lines for difflib
         old_lines = old_string.splitlines(keepends=True)
         new_lines = new_string.splitlines(keepends=True)
@@ -600,6 +789,13 @@ class ConversationMonitor:
         if new_lines and not new_lines[-1].endswith("\n"):
             new_lines[-1] += "\n"
 
+        # Single-line replacements are by far the most common edit; their diff
+        # is one fixed hunk, so skip the sequence matcher entirely
+        if len(old_lines) == 1 and len(new_lines) == 1:
+            if old_lines[0] == new_lines[0]:
+                return "# No changes detected"
+            return f"@@ -1 +1 @@\n-{old_lines[0]}+{new_lines[0]}".rstrip("\n")
+
         # Generate unified diff
         diff_lines = difflib.unified_diff(
             old_lines,
@@ -607,23 +803,16 @@ class ConversationMonitor:
             n=3,  # Context lines
         )
 
-        # Convert generator to list and join
-        diff_content = "".join(diff_lines)
+        # Consume the generator once, dropping the --- and +++ file header.
+        # Only the first two lines are headers; removed or added lines that
+        # happen to start with -- or ++ are kept
+        filtered_lines = list(itertools.islice(diff_lines, 2, None))
 
         # If diff is empty (strings are identical), show a message
-        if not diff_content:
+        if not filtered_lines:
             return "# No changes detected"
 
-        # Remove header lines (--- and +++) and trailing newlines
-        lines = diff_content.splitlines()
-        # Filter out header lines that start with --- or +++
-        filtered_lines = [
-            line
-            for line in lines
-            if not (line.startswith("---") or line.startswith("+++"))
-        ]
-
-        return "\n".join(filtered_lines)
+        return "".join(filtered_lines).rstrip("\n")
 
     def _format_hook_notification(self, notification: Dict[str, Any]) -> Optional[str]:
         """Format hook notification for display."""
@@ -638,243 +827,11 @@ class ConversationMonitor:
             params = notification.get("parameters", {})
 
             # EVIDENCE-BASED formatting - only tools with verified parameter structures
-            if tool_name == "Bash":
-                # VERIFIED: {"command": "docker ps", "description": "Show running Docker containers", "timeout": 120000}
-                command = params.get("command", "")
-                description = params.get("description", "")
-                timeout = params.get("timeout")
-
-                # Format with full command in code block
-                message = "💻 **Bash**"
-                if description:
-                    message += f" - {description}"
-
-                # Add timeout info if specified
-                if timeout and timeout != 120000:  # Only show if different from default
-                    timeout_sec = timeout / 1000
-                    message += f" (timeout: {timeout_sec}s)"
-
-                message += f"\n```bash\n{command}\n```"
-                return message
-
-            elif tool_name == "LS":
-                # VERIFIED: {"path": "/home/..."}
-                path = params.get("path", "")
-                return f"📂 **Listing:** `{path}`"
-
-            elif tool_name == "Edit":
-                # VERIFIED: {"file_path": "/path/to/file", "old_string": "...", "new_string": "...", "replace_all": false}
-                file_path = params.get("file_path", "")
-                old_string = params.get("old_string", "")
-                new_string = params.get("new_string", "")
-                replace_all = params.get("replace_all", False)
-
-                # Get file language for syntax highlighting
-                lang = self._detect_language(file_path)
-
-                # Format the code changes
-                message = f"✏️ **Editing:** `{file_path}`"
-                if replace_all:
-                    message += " (replace all)"
-                message += "\n"
-
-                # If both old and new strings exist, create a diff
-                if old_string and new_string:
-                    diff_content = self._create_diff(old_string, new_string, file_path)
-                    message += f"\n**Changes:**\n```diff\n{diff_content}\n```"
-                else:
-                    # Show full old code
-                    if old_string:
-                        message += f"\n**Removing:**\n```{lang}\n{old_string}\n```\n"
-
-                    # Show full new code
-                    if new_string:
-                        message += f"\n**Adding:**\n```{lang}\n{new_string}\n```"
-
-                return message
-
-            elif tool_name == "TodoWrite":
-                # VERIFIED: {"todos": [{"content": "...", "status": "...", "priority": "...", "id": "..."}]}
-                todos = params.get("todos", [])
-                # Build detailed todo list
-                message = "📝 **Managing todos:**\n"
-
-                if todos:
-                    message += "\n**Todo List:**\n"
-                    for todo in todos:
-                        content = todo.get("content", "")
-                        status = todo.get("status", "unknown")
-                        priority = todo.get("priority", "")
-
-                        # Status emoji mapping
-                        status_emoji = {
-                            "pending": "⏳",
-                            "in_progress": "🔄",
-                            "completed": "✅",
-                        }.get(status, "❓")
-
-                        # Priority indicator
-                        priority_indicator = ""
-                        if priority == "high":
-                            priority_indicator = " 🔥"
-                        elif priority == "medium":
-                            priority_indicator = " ⚡"
-
-                        # Format each todo item
-                        message += f"{status_emoji} {content}{priority_indicator}\n"
-
-                return message.rstrip()
-
-            elif tool_name == "Read":
-                # VERIFIED: {"file_path": "/path/to/file", "offset": 162, "limit": 20}
-                file_path = params.get("file_path", "")
-                offset = params.get("offset")
-                limit = params.get("limit")
-                range_text = ""
-                if offset is not None or limit is not None:
-                    start = offset or 0
-                    if limit is not None:
-                        end = start + limit - 1  # -1 because limit is inclusive
-                        range_text = f" (lines {start}-{end})"
-                    else:
-                        range_text = f" (from line {start})"
-                return f"📖 **Reading:** `{file_path}`{range_text}"
-
-            elif tool_name == "Write":
-                # VERIFIED: {"file_path": "/path/to/file", "content": "..."}
-                file_path = params.get("file_path", "")
-                content = params.get("content", "")
+            formatter = self._PRE_TOOL_FORMATTERS.get(tool_name)
+            if formatter is not None:
+                return formatter(self, params)
 
-                # Get file language for syntax highlighting
-                lang = self._detect_language(file_path)
-
-                # Format the message with full content
-                message = f"✍️ **Writing:** `{file_path}`\n"
-                if content:
-                    message += f"\n**Content:**\n```{lang}\n{content}\n```"
-
-                return message
-
-            elif tool_name == "Grep":
-                # VERIFIED: {"pattern": "search_pattern", "path": "/path", "output_mode": "content", "-A": 3, "-B": 2}
-                pattern = params.get("pattern", "")
-                path = params.get("path", "CWD")
-                output_mode = params.get("output_mode", "files_with_matches")
-                context_after = params.get("-A")
-                context_before = params.get("-B")
-                context_both = params.get("-C")
-                case_insensitive = params.get("-i", False)
-                line_numbers = params.get("-n", False)
-                multiline = params.get("multiline", False)
-
-                # Format with full pattern in code block
-                message = f"🔍 **Grep in:** `{path}`"
-
-                # Add mode and flags info
-                mode_parts = []
-                if output_mode != "files_with_matches":
-                    mode_parts.append(output_mode)
-                if case_insensitive:
-                    mode_parts.append("case-insensitive")
-                if line_numbers:
-                    mode_parts.append("line numbers")
-                if multiline:
-                    mode_parts.append("multiline")
-
-                # Add context info
-                if context_both:
-                    mode_parts.append(f"±{context_both} lines")
-                elif context_before or context_after:
-                    if context_before:
-                        mode_parts.append(f"-{context_before} lines before")
-                    if context_after:
-                        mode_parts.append(f"+{context_after} lines after")
-
-                if mode_parts:
-                    message += f" ({', '.join(mode_parts)})"
-
-                message += f"\n```regex\n{pattern}\n```"
-                return message
-
-            elif tool_name == "Glob":
-                # VERIFIED: {"pattern": "*requirements*.txt", "path": "/home/..."}
-                pattern = params.get("pattern", "")
-                path = params.get("path", "")
-
-                message = f"🗂️ **Finding files:** `{pattern}`"
-                if path:
-                    message += f" in `{path}`"
-                return message
-
-            elif tool_name == "MultiEdit":
-                # VERIFIED: {"file_path": "/path/to/file", "edits": [{"old_string": "...", "new_string": "..."}]}
-                file_path = params.get("file_path", "")
-                edits = params.get("edits", [])
-
-                # Get file language for syntax highlighting
-                lang = self._detect_language(file_path)
-
-                # Format the message
-                message = f"✏️ **Multi-editing:** `{file_path}` ({len(edits)} changes)\n"
-
-                # Show all edits
-                for i, edit in enumerate(edits, 1):
-                    old_string = edit.get("old_string", "")
-                    new_string = edit.get("new_string", "")
-
-                    message += f"\n**Edit {i}:**"
-
-                    # If both old and new strings exist, create a diff
-                    if old_string and new_string:
-                        diff_content = self._create_diff(
-                            old_string, new_string, file_path
-                        )
-                        message += f"\n```diff\n{diff_content}\n```"
-                    else:
-                        if old_string:
-                            message += f"\n**Removing:**\n```{lang}\n{old_string}\n```"
-                        if new_string:
-                            message += f"\n**Adding:**\n```{lang}\n{new_string}\n```"
-
-                    if i < len(edits):
-                        message += "\n"
-
-                return message
-
-            elif tool_name == "WebSearch":
-                # VERIFIED: {"query": "search terms"}
-                query = params.get("query", "")
-                return f"🌐 **Web Search:**\n```\n{query}\n```"
-
-            elif tool_name == "ExitPlanMode":
-                # VERIFIED: {"plan": "plan content"}
-                return "📋 **Planning Complete**"
-
-            elif tool_name == "Task":
-                # VERIFIED: {"description": "task description", "prompt": "detailed prompt", "subagent_type": "agent type"}
-                description = params.get("description", "")
-                subagent_type = params.get("subagent_type", "")
-                prompt = params.get("prompt", "")
-
-                message = f"🤖 **Starting Task:** {description}"
-                if subagent_type:
-                    message += f"\n**Agent:** {subagent_type}"
-                if prompt:
-                    # Always show full prompt for Task tools - users want complete context
-                    message += f"\n**Prompt:** {prompt}"
-                return message
-
-            elif tool_name == "WebFetch":
-                # VERIFIED: {"url": "https://...", "prompt": "extraction prompt"}
-                url = params.get("url", "")
-                prompt = params.get("prompt", "")
-
-                message = f"🌐 **Fetching:** {url}"
-                if prompt:
-                    message += f"\n**Extract:** {prompt}"
-                return message
-
-            elif tool_name.startswith("mcp__"):
+            if tool_name.startswith("mcp__"):
                 # Generic MCP tool - extract server and tool name, format all string parameters
                 parts = tool_name.split("__")
                 if len(parts) >= 3:
@@ -892,232 +849,14 @@ class ConversationMonitor:
         elif notif_type == "post_tool_use":
             tool_name = notification.get("tool_name", "Unknown")
             tool_response = notification.get("tool_response", {})
+            params = notification.get("parameters") or {}
 
             # Format based on tool type with completion status
-            if tool_name == "Edit":
-                # Show which file was edited with additional info
-                params = notification.get("parameters", {})
-                file_path = params.get("file_path", "")
+            formatter = self._POST_TOOL_FORMATTERS.get(tool_name)
+            if formatter is not None:
+                return formatter(self, params, tool_response)
 
-                message = "✅ **Edit completed**"
-                if file_path:
-                    message += f": `{file_path}`"
-
-                # Add structured patch and modification info
-                if isinstance(tool_response, dict):
-                    user_modified = tool_response.get("userModified", False)
-                    structured_patch = tool_response.get("structuredPatch")
-
-                    if user_modified:
-                        message += " ⚠️ *user modified*"
-
-                    if structured_patch and isinstance(structured_patch, list):
-                        patch_count = len(structured_patch)
-                        if patch_count > 1:
-                            message += f" ({patch_count} patches)"
-
-                return message
-            elif tool_name == "MultiEdit":
-                # Show which file and how many edits with additional info
-                params = notification.get("parameters", {})
-                file_path = params.get("file_path", "")
-                edits = params.get("edits", [])
-                edit_count = len(edits)
-
-                message = f"✅ **{edit_count} edit(s) completed**"
-                if file_path:
-                    message += f": `{file_path}`"
-
-                # Add structured patch and modification info
-                if isinstance(tool_response, dict):
-                    user_modified = tool_response.get("userModified", False)
-                    structured_patch = tool_response.get("structuredPatch")
-
-                    if user_modified:
-                        message += " ⚠️ *user modified*"
-
-                    if structured_patch and isinstance(structured_patch, list):
-                        patch_count = len(structured_patch)
-                        if patch_count != edit_count:
-                            message += f" ({patch_count} patches)"
-
-                return message
-            elif tool_name == "Write":
-                # Show which file was created with size and patch info
-                params = notification.get("parameters", {})
-                file_path = params.get("file_path", "")
-                content = params.get("content", "")
-
-                message = "✅ **File written**"
-                if file_path:
-                    size_info = f" ({len(content)} chars)" if content else ""
-                    message += f": `{file_path}`{size_info}"
-
-                # Add structured patch info if available
-                if isinstance(tool_response, dict):
-                    structured_patch = tool_response.get("structuredPatch")
-                    if structured_patch and isinstance(structured_patch, list):
-                        patch_count = len(structured_patch)
-                        if patch_count > 0:
-                            message += f" ({patch_count} patches)"
-
-                return message
-            elif tool_name == "Read":
-                return None  # Silenced for better UX
-            elif tool_name == "LS":
-                # Format LS tool response with actual directory contents
-                message = "✅ **Directory listing:**"
-                if isinstance(tool_response, str) and tool_response.strip():
-                    # Truncate if too long (Telegram has message size limits)
-                    content = tool_response.strip()
-                    if len(content) > 3000:
-                        content = content[:3000] + "\n... (truncated)"
-                    message += f"\n```\n{content}\n```"
-                return message
-            elif tool_name == "Grep":
-                # Format Grep results with match count and preview
-                message = "✅ **Search completed**"
-                if isinstance(tool_response, dict):
-                    mode = tool_response.get("mode", "")
-                    num_lines = tool_response.get("numLines", 0)
-
-                    if mode == "files_with_matches":
-                        filenames = tool_response.get("filenames", [])
-                        if filenames:
-                            message += f"\nFound in {len(filenames)} file(s):"
-                            for fname in filenames[:10]:  # Show first 10
-                                message += f"\n• `{fname}`"
-                            if len(filenames) > 10:
-                                message += f"\n... and {len(filenames) - 10} more"
-                    elif mode == "count":
-                        message += f"\nTotal matches: {num_lines}"
-                    elif mode == "content" and num_lines > 0:
-                        message += f"\nFound {num_lines} matching line(s)"
-                        content = tool_response.get("content", "")
-                        if content:
-                            # Show preview of matches
-                            preview = content[:500]
-                            if len(content) > 500:
-                                preview += "\n... (truncated)"
-                            message += f"\n```\n{preview}\n```"
-                    else:
-                        message += "\nNo matches found"
-                return message
-            elif tool_name == "Bash":
-                # For Bash commands, include the output and status
-                message = "✅ **Command completed**"
-
-                # Extract stdout and stderr from the tool response
-                if isinstance(tool_response, dict):
-                    stdout = tool_response.get("stdout", "").strip()
-                    stderr = tool_response.get("stderr", "").strip()
-                    interrupted = tool_response.get("interrupted", False)
-                    return_code_interpretation = tool_response.get(
-                        "returnCodeInterpretation", ""
-                    )
-
-                    # Add status indicators
-                    status_parts = []
-                    if interrupted:
-                        status_parts.append("⚠️ interrupted")
-                    if (
-                        return_code_interpretation
-                        and return_code_interpretation != "success"
-                    ):
-                        status_parts.append(f"status: {return_code_interpretation}")
-
-                    if status_parts:
-                        message += f" ({', '.join(status_parts)})"
-
-                    if stdout:
-                        message += f"\n\n**Output:**\n```\n{stdout}\n```"
-                    if stderr:
-                        message += f"\n\n**Error output:**\n```\n{stderr}\n```"
-
-                return message
-            elif tool_name == "Glob":
-                # Glob completion with performance metrics
-                message = "✅ **File search completed**"
-                if isinstance(tool_response, dict):
-                    num_files = tool_response.get("numFiles")
-                    duration = tool_response.get("durationMs")
-                    truncated = tool_response.get("truncated", False)
-
-                    metrics = []
-                    if num_files is not None:
-                        metrics.append(f"{num_files} files")
-                    if duration:
-                        metrics.append(f"{duration}ms")
-
-                    if metrics:
-                        message += f" ({', '.join(metrics)})"
-
-                    if truncated:
-                        message += " ⚠️ *truncated*"
-
-                return message
-            elif tool_name == "WebSearch":
-                # WebSearch completion with duration metrics
-                message = "✅ **Web search completed**"
-                if isinstance(tool_response, dict):
-                    duration = tool_response.get("durationSeconds")
-                    results = tool_response.get("results", [])
-
-                    metrics = []
-                    if len(results) > 0:
-                        metrics.append(f"{len(results)} results")
-                    if duration:
-                        metrics.append(f"{duration:.1f}s")
-
-                    if metrics:
-                        message += f" ({', '.join(metrics)})"
-
-                return message
-            elif tool_name == "ExitPlanMode":
-                # ExitPlanMode indicates planning is complete and ready to proceed
-                return "✅ **Plan ready - awaiting approval**"
-            elif tool_name == "Task":
-                # Task completion with performance metrics
-                message = "✅ **Task completed**"
-                if isinstance(tool_response, dict):
-                    duration = tool_response.get("totalDurationMs")
-                    tokens = tool_response.get("totalTokens")
-                    tool_count = tool_response.get("totalToolUseCount")
-                    was_interrupted = tool_response.get("wasInterrupted", False)
-
-                    metrics = []
-                    if duration:
-                        metrics.append(f"{duration}ms")
-                    if tokens:
-                        metrics.append(f"{tokens} tokens")
-                    if tool_count:
-                        metrics.append(f"{tool_count} tools")
-
-                    if metrics:
-                        message += f" ({', '.join(metrics)})"
-
-                    if was_interrupted:
-                        message += " ⚠️ *interrupted*"
-
-                return message
-            elif tool_name == "WebFetch":
-                # WebFetch completion with response info
-                message = "✅ **Fetch completed**"
-                if isinstance(tool_response, dict):
-                    url = tool_response.get("url", "")
-                    code = tool_response.get("code")
-                    duration = tool_response.get("durationMs")
-                    bytes_fetched = tool_response.get("bytes")
-
-                    if code:
-                        message += f" ({code})"
-                    if duration:
-                        message += f" in {duration}ms"
-                    if bytes_fetched:
-                        message += f" - {bytes_fetched} bytes"
-
-                return message
-            elif tool_name.startswith("mcp__"):
+            if tool_name.startswith("mcp__"):
                 # Generic MCP tool - format tool response with all available fields
                 parts = tool_name.split("__")
                 if len(parts) >= 3:
@@ -1138,6 +877,516 @@ class ConversationMonitor:
 
         return None
 
+    def _format_pre_bash(self, params: Dict[str, Any]) -> str:
+        """Format a Bash tool invocation."""
+        # VERIFIED: {"command": "docker ps", "description": "Show running Docker containers", "timeout": 120000}
+        command = params.get("command", "")
+        description = params.get("description", "")
+        timeout = params.get("timeout")
+
+        # Format with full command in code block
+        message = "💻 **Bash**"
+        if description:
+            message += f" - {description}"
+
+        # Add timeout info if specified
+        if timeout and timeout != 120000:  # Only show if different from default
+            timeout_sec = timeout / 1000
+            message += f" (timeout: {timeout_sec}s)"
+
+        message += f"\n```bash\n{command}\n```"
+        return message
+
+    def _format_pre_ls(self, params: Dict[str, Any]) -> str:
+        """Format an LS tool invocation."""
+        # VERIFIED: {"path": "/home/..."}
+        path = params.get("path", "")
+        return f"📂 **Listing:** `{path}`"
+
+    def _format_pre_edit(self, params: Dict[str, Any]) -> str:
+        """Format an Edit tool invocation."""
+        # VERIFIED: {"file_path": "/path/to/file", "old_string": "...", "new_string": "...", "replace_all": false}
+        file_path = params.get("file_path", "")
+        old_string = params.get("old_string", "")
+        new_string = params.get("new_string", "")
+        replace_all = params.get("replace_all", False)
+
+        # Get file language for syntax highlighting
+        lang = self._detect_language(file_path)
+
+        # Format the code changes
+        message = f"✏️ **Editing:** `{file_path}`"
+        if replace_all:
+            message += " (replace all)"
+        message += "\n"
+
+        # If both old and new strings exist, create a diff
+        if old_string and new_string:
+            diff_content = self._create_diff(old_string, new_string, file_path)
+            message += f"\n**Changes:**\n```diff\n{diff_content}\n```"
+        else:
+            # Show full old code
+            if old_string:
+                message += f"\n**Removing:**\n```{lang}\n{old_string}\n```\n"
+
+            # Show full new code
+            if new_string:
+                message += f"\n**Adding:**\n```{lang}\n{new_string}\n```"
+
+        return message
+
+    def _format_pre_todo_write(self, params: Dict[str, Any]) -> str:
+        """Format a TodoWrite tool invocation."""
+        # VERIFIED: {"todos": [{"content": "...", "status": "...", "priority": "...", "id": "..."}]}
+        todos = params.get("todos", [])
+        # Build detailed todo list
+        if not todos:
+            return "📝 **Managing todos:**"
+
+        status_emoji_for = _TODO_STATUS_EMOJI.get
+        priority_indicator_for = _TODO_PRIORITY_INDICATOR.get
+        lines = ["📝 **Managing todos:**\n", "**Todo List:**"]
+        lines += [
+            f"{status_emoji_for(todo.get('status', 'unknown'), '❓')} "
+            f"{todo.get('content', '')}"
+            f"{priority_indicator_for(todo.get('priority', ''), '')}"
+            for todo in todos
+        ]
+
+        return "\n".join(lines).rstrip()
+
+    def _format_pre_read(self, params: Dict[str, Any]) -> str:
+        """Format a Read tool invocation."""
+        # VERIFIED: {"file_path": "/path/to/file", "offset": 162, "limit": 20}
+        file_path = params.get("file_path", "")
+        offset = params.get("offset")
+        limit = params.get("limit")
+        range_text = ""
+        if offset is not None or limit is not None:
+            start = offset or 0
+            if limit is not None:
+                end = start + limit - 1  # -1 because limit is inclusive
+                range_text = f" (lines {start}-{end})"
+            else:
+                range_text = f" (from line {start})"
+        return f"📖 **Reading:** `{file_path}`{range_text}"
+
+    def _format_pre_write(self, params: Dict[str, Any]) -> str:
+        """Format a Write tool invocation."""
+        # VERIFIED: {"file_path": "/path/to/file", "content": "..."}
+        file_path = params.get("file_path", "")
+        content = params.get("content", "")
+
+        # Get file language for syntax highlighting
+        lang = self._detect_language(file_path)
+
+        # Format the message with full content
+        message = f"✍️ **Writing:** `{file_path}`\n"
+        if content:
+            message += f"\n**Content:**\n```{lang}\n{content}\n```"
+
+        return message
+
+    def _format_pre_grep(self, params: Dict[str, Any]) -> str:
+        """Format a Grep tool invocation."""
+        # VERIFIED: {"pattern": "search_pattern", "path": "/path", "output_mode": "content", "-A": 3, "-B": 2}
+        pattern = params.get("pattern", "")
+        path = params.get("path", "CWD")
+        output_mode = params.get("output_mode", "files_with_matches")
+        context_after = params.get("-A")
+        context_before = params.get("-B")
+        context_both = params.get("-C")
+        case_insensitive = params.get("-i", False)
+        line_numbers = params.get("-n", False)
+        multiline = params.get("multiline", False)
+
+        # Format with full pattern in code block
+        message = f"🔍 **Grep in:** `{path}`"
+
+        # Add mode and flags info
+        mode_parts = []
+        if output_mode != "files_with_matches":
+            mode_parts.append(output_mode)
+        if case_insensitive:
+            mode_parts.append("case-insensitive")
+        if line_numbers:
+            mode_parts.append("line numbers")
+        if multiline:
+            mode_parts.append("multiline")
+
+        # Add context info
+        if context_both:
+            mode_parts.append(f"±{context_both} lines")
+        elif context_before or context_after:
+            if context_before:
+                mode_parts.append(f"-{context_before} lines before")
+            if context_after:
+                mode_parts.append(f"+{context_after} lines after")
+
+        if mode_parts:
+            message += f" ({', '.join(mode_parts)})"
+
+        message += f"\n```regex\n{pattern}\n```"
+        return message
+
+    def _format_pre_glob(self, params: Dict[str, Any]) -> str:
+        """Format a Glob tool invocation."""
+        # VERIFIED: {"pattern": "*requirements*.txt", "path": "/home/..."}
+        pattern = params.get("pattern", "")
+        path = params.get("path", "")
+
+        message = f"🗂️ **Finding files:** `{pattern}`"
+        if path:
+            message += f" in `{path}`"
+        return message
+
+    def _format_pre_multi_edit(self, params: Dict[str, Any]) -> str:
+        """Format a MultiEdit tool invocation."""
+        # VERIFIED: {"file_path": "/path/to/file", "edits": [{"old_string": "...", "new_string": "..."}]}
+        file_path = params.get("file_path", "")
+        edits = params.get("edits", [])
+
+        # Get file language for syntax highlighting
+        lang = self._detect_language(file_path)
+
+        # Collect the pieces and join once; edit bodies can be large
+        parts = [f"✏️ **Multi-editing:** `{file_path}` ({len(edits)} changes)\n"]
+
+        # Show all edits
+        for i, edit in enumerate(edits, 1):
+            old_string = edit.get("old_string", "")
+            new_string = edit.get("new_string", "")
+
+            parts.append(f"\n**Edit {i}:**")
+
+            # If both old and new strings exist, create a diff
+            if old_string and new_string:
+                diff_content = self._create_diff(old_string, new_string, file_path)
+                parts.append(f"\n```diff\n{diff_content}\n```")
+            else:
+                if old_string:
+                    parts.append(f"\n**Removing:**\n```{lang}\n{old_string}\n```")
+                if new_string:
+                    parts.append(f"\n**Adding:**\n```{lang}\n{new_string}\n```")
+
+            if i < len(edits):
+                parts.append("\n")
+
+        return "".join(parts)
+
+    def _format_pre_web_search(self, params: Dict[str, Any]) -> str:
+        """Format a WebSearch tool invocation."""
+        # VERIFIED: {"query": "search terms"}
+        query = params.get("query", "")
+        return f"🌐 **Web Search:**\n```\n{query}\n```"
+
+    def _format_pre_exit_plan_mode(self, params: Dict[str, Any]) -> str:
+        """Format an ExitPlanMode tool invocation."""
+        # VERIFIED: {"plan": "plan content"}
+        return "📋 **Planning Complete**"
+
+    def _format_pre_task(self, params: Dict[str, Any]) -> str:
+        """Format a Task tool invocation."""
+        # VERIFIED: {"description": "task description", "prompt": "detailed prompt", "subagent_type": "agent type"}
+        description = params.get("description", "")
+        subagent_type = params.get("subagent_type", "")
+        prompt = params.get("prompt", "")
+
+        message = f"🤖 **Starting Task:** {description}"
+        if subagent_type:
+            message += f"\n**Agent:** {subagent_type}"
+        if prompt:
+            # Always show full prompt for Task tools - users want complete context
+            message += f"\n**Prompt:** {prompt}"
+        return message
+
+    def _format_pre_web_fetch(self, params: Dict[str, Any]) -> str:
+        """Format a WebFetch tool invocation."""
+        # VERIFIED: {"url": "https://...", "prompt": "extraction prompt"}
+        url = params.get("url", "")
+        prompt = params.get("prompt", "")
+
+        message = f"🌐 **Fetching:** {url}"
+        if prompt:
+            message += f"\n**Extract:** {prompt}"
+        return message
+
+    # Tool name -> pre_tool_use formatter, looked up once per notification
+    _PRE_TOOL_FORMATTERS = {
+        "Bash": _format_pre_bash,
+        "LS": _format_pre_ls,
+        "Edit": _format_pre_edit,
+        "TodoWrite": _format_pre_todo_write,
+        "Read": _format_pre_read,
+        "Write": _format_pre_write,
+        "Grep": _format_pre_grep,
+        "Glob": _format_pre_glob,
+        "MultiEdit": _format_pre_multi_edit,
+        "WebSearch": _format_pre_web_search,
+        "ExitPlanMode": _format_pre_exit_plan_mode,
+        "Task": _format_pre_task,
+        "WebFetch": _format_pre_web_fetch,
+    }
+
+    def _format_post_edit(self, params: Dict[str, Any], tool_response: Any) -> str:
+        """Format an Edit tool completion."""
+        # Show which file was edited with additional info
+        file_path = params.get("file_path", "")
+        response = _response_fields(tool_response)
+
+        message = "✅ **Edit completed**"
+        if file_path:
+            message += f": `{file_path}`"
+
+        # Add structured patch and modification info
+        if response.get("userModified", False):
+            message += " ⚠️ *user modified*"
+
+        patch_count = _patch_count(response)
+        if patch_count > 1:
+            message += f" ({patch_count} patches)"
+
+        return message
+
+    def _format_post_multi_edit(
+        self, params: Dict[str, Any], tool_response: Any
+    ) -> str:
+        """Format a MultiEdit tool completion."""
+        # Show which file and how many edits with additional info
+        file_path = params.get("file_path", "")
+        response = _response_fields(tool_response)
+
+        edits = params.get("edits", [])
+        edit_count = len(edits)
+
+        message = f"✅ **{edit_count} edit(s) completed**"
+        if file_path:
+            message += f": `{file_path}`"
+
+        # Add structured patch and modification info
+        if response.get("userModified", False):
+            message += " ⚠️ *user modified*"
+
+        patch_count = _patch_count(response)
+        if patch_count > 0 and patch_count != edit_count:
+            message += f" ({patch_count} patches)"
+
+        return message
+
+    def _format_post_write(self, params: Dict[str, Any], tool_response: Any) -> str:
+        """Format a Write tool completion."""
+        # Show which file was created with size and patch info
+        file_path = params.get("file_path", "")
+        response = _response_fields(tool_response)
+
+        content = params.get("content", "")
+
+        message = "✅ **File written**"
+        if file_path:
+            size_info = f" ({len(content)} chars)" if content else ""
+            message += f": `{file_path}`{size_info}"
+
+        # Add structured patch info if available
+        patch_count = _patch_count(response)
+        if patch_count > 0:
+            message += f" ({patch_count} patches)"
+
+        return message
+
+    def _format_post_read(
+        self, params: Dict[str, Any], tool_response: Any
+    ) -> Optional[str]:
+        """Format a Read tool completion."""
+        return None  # Silenced for better UX
+
+    def _format_post_ls(self, params: Dict[str, Any], tool_response: Any) -> str:
+        """Format an LS tool completion."""
+        # Format LS tool response with actual directory contents
+        message = "✅ **Directory listing:**"
+        content = tool_response.strip() if isinstance(tool_response, str) else ""
+        if content:
+            # Truncate if too long (Telegram has message size limits)
+            content = _truncate(content, 3000)
+            message += f"\n```\n{content}\n```"
+        return message
+
+    def _format_post_grep(self, params: Dict[str, Any], tool_response: Any) -> str:
+        """Format a Grep tool completion."""
+        # Format Grep results with match count and preview
+        response = _response_fields(tool_response)
+
+        message = "✅ **Search completed**"
+        mode = response.get("mode", "")
+        num_lines = response.get("numLines", 0)
+
+        if mode == "files_with_matches":
+            filenames = response.get("filenames", [])
+            if filenames:
+                lines = [message, f"Found in {len(filenames)} file(s):"]
+                lines += [f"• `{fname}`" for fname in filenames[:10]]  # First 10
+                if len(filenames) > 10:
+                    lines.append(f"... and {len(filenames) - 10} more")
+                message = "\n".join(lines)
+        elif mode == "count":
+            message += f"\nTotal matches: {num_lines}"
+        elif mode == "content" and num_lines > 0:
+            message += f"\nFound {num_lines} matching line(s)"
+            content = response.get("content", "")
+            if content:
+                # Show preview of matches
+                message += f"\n```\n{_truncate(content, 500)}\n```"
+        else:
+            message += "\nNo matches found"
+        return message
+
+    def _format_post_bash(self, params: Dict[str, Any], tool_response: Any) -> str:
+        """Format a Bash tool completion."""
+        # For Bash commands, include the output and status
+        response = _response_fields(tool_response)
+
+        message = "✅ **Command completed**"
+
+        # Extract stdout and stderr from the tool response
+        stdout = response.get("stdout", "").strip()
+        stderr = response.get("stderr", "").strip()
+        interrupted = response.get("interrupted", False)
+        return_code_interpretation = response.get("returnCodeInterpretation", "")
+
+        # Add status indicators
+        status_parts = []
+        if interrupted:
+            status_parts.append("⚠️ interrupted")
+        if return_code_interpretation and return_code_interpretation != "success":
+            status_parts.append(f"status: {return_code_interpretation}")
+
+        # Collect the pieces and join once so a large stdout is copied
+        # into the final message a single time
+        parts = [message]
+        if status_parts:
+            parts.append(f" ({', '.join(status_parts)})")
+
+        if stdout:
+            parts += ("\n\n**Output:**\n```\n", stdout, "\n```")
+        if stderr:
+            parts += ("\n\n**Error output:**\n```\n", stderr, "\n```")
+
+        return "".join(parts)
+
+    def _format_post_glob(self, params: Dict[str, Any], tool_response: Any) -> str:
+        """Format a Glob tool completion."""
+        # Glob completion with performance metrics
+        response = _response_fields(tool_response)
+
+        message = "✅ **File search completed**"
+        num_files = response.get("numFiles")
+        duration = response.get("durationMs")
+        truncated = response.get("truncated", False)
+
+        metrics = []
+        if num_files is not None:
+            metrics.append(f"{num_files} files")
+        if duration:
+            metrics.append(f"{duration}ms")
+
+        if metrics:
+            message += f" ({', '.join(metrics)})"
+
+        if truncated:
+            message += " ⚠️ *truncated*"
+
+        return message
+
+    def _format_post_web_search(
+        self, params: Dict[str, Any], tool_response: Any
+    ) -> str:
+        """Format a WebSearch tool completion."""
+        # WebSearch completion with duration metrics
+        response = _response_fields(tool_response)
+
+        message = "✅ **Web search completed**"
+        duration = response.get("durationSeconds")
+        results = response.get("results", [])
+
+        metrics = []
+        if len(results) > 0:
+            metrics.append(f"{len(results)} results")
+        if duration:
+            metrics.append(f"{duration:.1f}s")
+
+        if metrics:
+            message += f" ({', '.join(metrics)})"
+
+        return message
+
+    def _format_post_exit_plan_mode(
+        self, params: Dict[str, Any], tool_response: Any
+    ) -> str:
+        """Format an ExitPlanMode tool completion."""
+        # ExitPlanMode indicates planning is complete and ready to proceed
+        return "✅ **Plan ready - awaiting approval**"
+
+    def _format_post_task(self, params: Dict[str, Any], tool_response: Any) -> str:
+        """Format a Task tool completion."""
+        # Task completion with performance metrics
+        response = _response_fields(tool_response)
+
+        message = "✅ **Task completed**"
+        duration = response.get("totalDurationMs")
+        tokens = response.get("totalTokens")
+        tool_count = response.get("totalToolUseCount")
+        was_interrupted = response.get("wasInterrupted", False)
+
+        metrics = []
+        if duration:
+            metrics.append(f"{duration}ms")
+        if tokens:
+            metrics.append(f"{tokens} tokens")
+        if tool_count:
+            metrics.append(f"{tool_count} tools")
+
+        if metrics:
+            message += f" ({', '.join(metrics)})"
+
+        if was_interrupted:
+            message += " ⚠️ *interrupted*"
+
+        return message
+
+    def _format_post_web_fetch(self, params: Dict[str, Any], tool_response: Any) -> str:
+        """Format a WebFetch tool completion."""
+        # WebFetch completion with response info
+        response = _response_fields(tool_response)
+
+        message = "✅ **Fetch completed**"
+        code = response.get("code")
+        duration = response.get("durationMs")
+        bytes_fetched = response.get("bytes")
+
+        if code:
+            message += f" ({code})"
+        if duration:
+            message += f" in {duration}ms"
+        if bytes_fetched:
+            message += f" - {bytes_fetched} bytes"
+
+        return message
+
+    # Tool name -> post_tool_use formatter, looked up once per notification
+    _POST_TOOL_FORMATTERS = {
+        "Edit": _format_post_edit,
+        "MultiEdit": _format_post_multi_edit,
+        "Write": _format_post_write,
+        "Read": _format_post_read,
+        "LS": _format_post_ls,
+        "Grep": _format_post_grep,
+        "Bash": _format_post_bash,
+        "Glob": _format_post_glob,
+        "WebSearch": _format_post_web_search,
+        "ExitPlanMode": _format_post_exit_plan_mode,
+        "Task": _format_post_task,
+        "WebFetch": _format_post_web_fetch,
+    }
+
     def _format_generic_tool_with_params(
         self, tool_name: str, params: dict, icon: str
     ) -> str:
@@ -1236,16 +1485,14 @@ class ConversationMonitor:
 
         # Extract and format string fields
         for field in string_response_fields:
-            if (
-                field in tool_response
-                and isinstance(tool_response[field], str)
-                and tool_response[field].strip()
-            ):
-                field_value = tool_response[field].strip()
+            field_value = tool_response.get(field)
+            if not isinstance(field_value, str):
+                continue
+            field_value = field_value.strip()
+            if field_value:
                 field_display = field.replace("_", " ").title()
                 # Truncate very long content
-                if len(field_value) > 1000:
-                    field_value = field_value[:1000] + "\n... (truncated)"
+                field_value = _truncate(field_value, 1000)
                 message += f"\n\n**{field_display}:**\n```\n{field_value}\n```"
 
         # Extract and format numeric fields
@@ -1,13 +1,18 @@
 """Proactive permission dialog monitoring for faster response times."""
 
 import asyncio
+import functools
 import hashlib
+import heapq
 import json
+import logging
 import sys
 import time
 
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+import orjson
 import structlog
 
 
@@ -18,7 +23,7 @@ else:
     # Fallback implementation for older Python versions
     class TaskGroup:
         def __init__(self):
-            self._tasks = []
+            self._tasks = set()
 
         async def __aenter__(self):
             return self
@@ -31,13 +36,15 @@ else:
 
             # Wait for all tasks to complete
             if self._tasks:
-                await asyncio.gather(*self._tasks, return_exceptions=True)
+                await asyncio.gather(*list(self._tasks), return_exceptions=True)
 
             return False
 
         def create_task(self, coro):
             task = asyncio.create_task(coro)
-            self._tasks.append(task)
+            # Forget finished tasks so long-running groups don't accumulate them
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
             return task
 
 
@@ -47,44 +54,84 @@ logger = structlog.get_logger()
 MONITORING_DURATION = 5.0  # 5 seconds maximum monitoring window
 MONITORING_INTERVAL = 0.5  # 500ms between checks
 CLEANUP_INTERVAL = 60.0  # 60 seconds between cleanup runs
+SIMPLIFIED_DIALOG_MAX_AGE = 300  # 5 minutes before simplified dialogs expire
+PERMISSION_TAIL_LINES = 40  # Dialogs render at the bottom of the pane
+SIMPLIFIED_PERMISSION_MESSAGE = "⚡ Claude needs permission to use {tool_name}"
+
+# Slotted dataclasses need Python 3.10+; older versions keep the instance dict
+_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def _tail(content: str, n: int = PERMISSION_TAIL_LINES) -> str:
+    """Return the last ``n`` lines of captured pane content."""
+    return "\n".join(content.rsplit("\n", n)[-n:])
+
+
+def _fingerprint(content: str) -> Tuple[int, bytes]:
+    """Cheap identity for pane content: length plus a digest of its tail."""
+    digest = hashlib.blake2b(content[-2048:].encode(), digest_size=8).digest()
+    return len(content), digest
+
+
+@dataclass(**_SLOTS)
+class _MonitorState:
+    """Monitoring task and simplified dialog tracking for one session."""
+
+    task: Optional[asyncio.Task] = None
+    context_hash: bytes = b""  # Set once a simplified dialog has been sent
+    timestamp: float = 0.0
+    user_responded: bool = False
+    tool_name: str = "Unknown"
+    # tool_input object context_hash was computed from; the same object coming
+    # back with the Notification can reuse the hash instead of re-serializing
+    hashed_input: Any = None
+    # Resolved once an in-flight simplified dialog send has finished
+    sending: Optional[asyncio.Future] = None
+
+    @property
+    def has_simplified_dialog(self) -> bool:
+        return bool(self.context_hash)
 
 
 class PermissionMonitor:
-    """Singleton monitor for proactive permission dialog detection.
+    """Monitor for proactive permission dialog detection.
 
     Coordinates with existing unix socket server to monitor for permission dialogs
-    and send quick previews when detected.
+    and send quick previews when detected. Use the module-level
+    ``get_permission_monitor()`` instance rather than creating new ones.
     """
 
-    _instance: Optional["PermissionMonitor"] = None
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
+    __slots__ = (
+        "task_group",
+        "unix_socket_server",
+        "conversation_monitor",
+        "sessions",
+        "_dialog_heap",
+        "_cancelled_tasks",
+        "_capture_task",
+        "cleanup_task",
+    )
 
     def __init__(self):
-        if self._initialized:
-            return
-
-        self._initialized = True
         self.task_group: Optional[TaskGroup] = None
-        self.monitoring_tasks: Dict[str, asyncio.Task] = {}  # Keep for session tracking
         self.unix_socket_server = None  # Reference to server for tmux access
         self.conversation_monitor = (
             None  # Reference to conversation monitor for sending messages
         )
 
-        # Track simplified messages with context matching
-        self.simplified_dialogs: Dict[str, Dict[str, Any]] = (
-            {}
-        )  # session_id -> {tool_context, timestamp, user_responded}
+        # Monitoring task and simplified dialog tracking per session
+        self.sessions: Dict[str, _MonitorState] = {}
+        # (timestamp, session_id) of sent simplified dialogs, oldest first
+        self._dialog_heap: List[Tuple[float, str]] = []
+        # Monitors cancelled by stop_monitoring that are still unwinding
+        self._cancelled_tasks: Set[asyncio.Task] = set()
+        # Pane capture shared by monitors that fall back at the same time
+        self._capture_task: Optional[asyncio.Future] = None
 
         # Periodic cleanup task
         self.cleanup_task: Optional[asyncio.Task] = None
 
-        logger.info("PermissionMonitor singleton initialized")
+        logger.info("PermissionMonitor initialized")
 
     async def configure(self, unix_socket_server, conversation_monitor):
         """Configure the monitor with required dependencies."""
@@ -112,10 +159,10 @@ class PermissionMonitor:
             logger.info("Started periodic cleanup task")
 
     async def _run_periodic_cleanup(self):
-        """Run periodic cleanup every CLEANUP_INTERVAL seconds."""
+        """Run periodic cleanup at most every CLEANUP_INTERVAL seconds."""
         try:
             while True:
-                await asyncio.sleep(CLEANUP_INTERVAL)
+                await asyncio.sleep(self._next_cleanup_delay())
                 self.cleanup_old_sessions()
         except asyncio.CancelledError:
             logger.info("Periodic cleanup task cancelled")
@@ -123,16 +170,32 @@ class PermissionMonitor:
         except Exception as e:
             logger.error("Error in periodic cleanup task", error=str(e), exc_info=True)
 
+    def _next_cleanup_delay(self) -> float:
+        """Seconds until the oldest simplified dialog expires, capped at interval."""
+        if not self._dialog_heap:
+            return CLEANUP_INTERVAL
+        expires_at = self._dialog_heap[0][0] + SIMPLIFIED_DIALOG_MAX_AGE
+        return min(CLEANUP_INTERVAL, max(0.0, expires_at - time.monotonic()))
+
     async def shutdown(self):
         """Shutdown the permission monitor and clean up resources."""
         try:
-            # Shutdown task group (automatically cancels all tasks)
+            # asyncio.TaskGroup waits for its tasks on exit instead of cancelling
+            # them, and the cleanup loop never finishes, so cancel explicitly
+            if self.cleanup_task is not None:
+                self.cleanup_task.cancel()
+            for state in self.sessions.values():
+                if state.task is not None:
+                    state.task.cancel()
+
+            # Shutdown task group (waits for the cancelled tasks to finish)
             if self.task_group:
                 await self.task_group.__aexit__(None, None, None)
                 self.task_group = None
 
             # Clear task references
-            self.monitoring_tasks.clear()
+            for state in self.sessions.values():
+                state.task = None
             self.cleanup_task = None
 
             # Final cleanup
@@ -143,7 +206,7 @@ class PermissionMonitor:
         except Exception as e:
             logger.error("Error during shutdown", error=str(e), exc_info=True)
 
-    def _create_permission_context_hash(self, context: Dict[str, Any]) -> str:
+    def _create_permission_context_hash(self, context: Dict[str, Any]) -> bytes:
         """Create a unique hash for permission context comparison.
 
         This hash uniquely identifies a specific tool use request to prevent
@@ -153,7 +216,7 @@ class PermissionMonitor:
             context: Tool context containing tool_use and tool_input
 
         Returns:
-            A hash string uniquely identifying this permission request
+            Raw digest bytes uniquely identifying this permission request
         """
         try:
             tool_name = context.get("tool_use", "")
@@ -164,11 +227,20 @@ class PermissionMonitor:
             context_data = {"tool": tool_name, "input": tool_input}
 
             # Sort keys for consistent hashing
-            context_str = json.dumps(context_data, sort_keys=True)
-
-            # Create hash (using SHA256 for better collision resistance)
-            hash_obj = hashlib.sha256(context_str.encode())
-            return hash_obj.hexdigest()
+            try:
+                context_bytes = orjson.dumps(context_data, option=orjson.OPT_SORT_KEYS)
+            except orjson.JSONEncodeError:
+                # Inputs orjson rejects (e.g. non-string keys) take the slow path
+                context_bytes = json.dumps(
+                    context_data,
+                    sort_keys=True,
+                    separators=(",", ":"),
+                    ensure_ascii=False,
+                ).encode("utf-8")
+
+            # Only used for in-process dedup, so a short BLAKE2b digest is plenty
+            hash_obj = hashlib.blake2b(context_bytes, digest_size=16)
+            return hash_obj.digest()
 
         except Exception as e:
             logger.error(
@@ -177,7 +249,7 @@ class PermissionMonitor:
                 context_keys=list(context.keys()) if context else None,
             )
             # Return a unique fallback to avoid blocking
-            return f"error_{time.time()}"
+            return f"error_{time.time()}".encode()
 
     async def start_monitoring(
         self, session_id: str, tool_context: Dict[str, Any]
@@ -192,13 +264,6 @@ class PermissionMonitor:
             # Cancel any existing monitoring for this session (timer reset for latest tool)
             await self.stop_monitoring(session_id)
 
-            # Reset simplified message tracking for new monitoring
-            # (handled by clearing simplified_dialogs below)
-
-            # Clear any previous simplified dialog tracking for fresh start
-            if session_id in self.simplified_dialogs:
-                del self.simplified_dialogs[session_id]
-
             # Create new monitoring task using TaskGroup
             if self.task_group:
                 task = self.task_group.create_task(
@@ -208,13 +273,14 @@ class PermissionMonitor:
                 task = asyncio.create_task(
                     self._monitor_session(session_id, tool_context)
                 )
-            self.monitoring_tasks[session_id] = task
+            # Fresh state also drops any previous simplified dialog tracking
+            self.sessions[session_id] = _MonitorState(task=task)
 
             logger.info(
                 "Started permission monitoring",
                 session_id=session_id,
                 tool_name=tool_context.get("tool_use"),
-                active_monitors=len(self.monitoring_tasks),
+                active_monitors=self._active_monitor_count(),
             )
 
         except Exception as e:
@@ -231,21 +297,46 @@ class PermissionMonitor:
         Args:
             session_id: The Claude session ID to stop monitoring
         """
-        task = self.monitoring_tasks.get(session_id)
-        if task and not task.done():
+        state = self.sessions.get(session_id)
+        if state is None or state.task is None:
+            return
+
+        # Cancel without waiting for the task to unwind; its finally block
+        # only touches state it still owns
+        task = state.task
+        state.task = None
+        if not task.done():
             task.cancel()
-            try:
-                await task
-            except asyncio.CancelledError:
-                pass
+            # Hold a reference until the cancellation has been processed
+            self._cancelled_tasks.add(task)
+            task.add_done_callback(self._cancelled_tasks.discard)
+
+        self._discard_if_idle(session_id, state)
+        logger.debug(
+            "Stopped monitoring",
+            session_id=session_id,
+            remaining_monitors=self._active_monitor_count(),
+        )
 
-        if session_id in self.monitoring_tasks:
-            del self.monitoring_tasks[session_id]
-            logger.debug(
-                "Stopped monitoring",
-                session_id=session_id,
-                remaining_monitors=len(self.monitoring_tasks),
-            )
+    def _active_monitor_count(self) -> int:
+        """Count sessions that currently have a monitoring task."""
+        return sum(1 for state in self.sessions.values() if state.task is not None)
+
+    def _discard_if_idle(self, session_id: str, state: _MonitorState) -> None:
+        """Drop session state that tracks neither a task nor a simplified dialog."""
+        if state.task is None and not state.has_simplified_dialog:
+            if self.sessions.get(session_id) is state:
+                del self.sessions[session_id]
+
+    def _clear_simplified_dialog(self, session_id: str) -> None:
+        """Forget the simplified dialog for a session, keeping any running task."""
+        state = self.sessions.get(session_id)
+        if state is None:
+            return
+        if state.task is None:
+            del self.sessions[session_id]
+        else:
+            self.sessions[session_id] = _MonitorState(task=state.task)
 
     async def _monitor_session(
         self, session_id: str, tool_context: Dict[str, Any]
@@ -255,73 +346,111 @@ class PermissionMonitor:
         This runs in background for up to 5 seconds, checking every 500ms.
         If permission options are detected, sends simplified message immediately.
         """
-        start_time = time.time()
+        loop = asyncio.get_running_loop()
+        current_task = asyncio.current_task()
+        start_time = loop.time()
+        deadline = start_time + MONITORING_DURATION
         check_count = 0
+        last_fingerprint = None
 
         try:
-            while time.time() - start_time < MONITORING_DURATION:
+            while True:
+                # First check runs immediately, later ones every interval
+                if check_count:
+                    await asyncio.sleep(MONITORING_INTERVAL)
+                    if loop.time() >= deadline:
+                        break
                 check_count += 1
 
                 # Read current tmux content and check for permission dialog patterns
                 tmux_content = await self._read_tmux_content()
                 if tmux_content:
-                    permission_options = self._parse_permission_options(tmux_content)
+                    # Skip re-parsing while the pane is unchanged between checks
+                    fingerprint = _fingerprint(tmux_content)
+                    if fingerprint == last_fingerprint:
+                        continue
+                    last_fingerprint = fingerprint
+
+                    permission_options = self._parse_permission_options(
+                        _tail(tmux_content)
+                    )
+
+                    if not permission_options:
+                        continue
 
-                    if permission_options and session_id not in self.simplified_dialogs:
-                        logger.info(
-                            "Permission dialog detected during monitoring",
+                    state = self.sessions.get(session_id)
+                    if state is None or state.task is not current_task:
+                        return
+                    if state.has_simplified_dialog:
+                        continue
+
+                    logger.info(
+                        "Permission dialog detected during monitoring",
+                        session_id=session_id,
+                        options_count=len(permission_options),
+                        elapsed_time=loop.time() - start_time,
+                        check_number=check_count,
+                    )
+
+                    # Record the simplified dialog before sending it, with no await
+                    # in between, so a Notification arriving mid-send sees it
+                    context_hash = self._create_permission_context_hash(tool_context)
+                    state.context_hash = context_hash
+                    state.timestamp = time.monotonic()
+                    state.user_responded = False
+                    state.tool_name = tool_context.get("tool_use", "Unknown")
+                    state.hashed_input = tool_context.get("tool_input")
+                    heapq.heappush(self._dialog_heap, (state.timestamp, session_id))
+
+                    logger.info(
+                        "Stored permission context hash (simplified)",
+                        session_id=session_id,
+                        tool_name=state.tool_name,
+                        context_hash=context_hash[:8].hex(),  # Log first 8 bytes
+                    )
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            "Simplified permission tool context",
                             session_id=session_id,
-                            options_count=len(permission_options),
-                            elapsed_time=time.time() - start_time,
-                            check_number=check_count,
+                            full_tool_context=tool_context,
                         )
 
+                    # Stop monitoring timer to save resources
+                    logger.info(
+                        "Stopping monitoring after successful dialog detection",
+                        session_id=session_id,
+                        total_checks=check_count,
+                    )
+                    # Release the session so stop_monitoring can't cancel the send;
+                    # the Notification path waits on state.sending instead
+                    state.task = None
+                    sending = state.sending = loop.create_future()
+                    sent = False
+                    try:
                         # Send simplified permission message immediately
-                        await self._send_simplified_permission(
+                        sent = await self._send_simplified_permission(
                             session_id=session_id,
                             tool_context=tool_context,
                             options=permission_options,
                         )
-
-                        # Track this simplified dialog with hash for later matching
-                        context_hash = self._create_permission_context_hash(
-                            tool_context
-                        )
-                        # Store minimal data to prevent memory accumulation
-                        self.simplified_dialogs[session_id] = {
-                            "context_hash": context_hash,
-                            "timestamp": time.time(),
-                            "user_responded": False,
-                            "tool_name": tool_context.get("tool_use", "Unknown"),
-                        }
-                        # Session is now tracked in simplified_dialogs dictionary
-
-                        logger.info(
-                            "Stored permission context hash (simplified)",
-                            session_id=session_id,
-                            tool_name=tool_context.get("tool_use", "Unknown"),
-                            context_hash=context_hash[:16],  # Log first 16 chars
-                            full_tool_context=tool_context,  # Log full context for debugging
-                        )
-
-                        # Stop monitoring timer to save resources
-                        logger.info(
-                            "Stopping monitoring after successful dialog detection",
-                            session_id=session_id,
-                            total_checks=check_count,
-                        )
-                        # Clean up monitoring task immediately
-                        if session_id in self.monitoring_tasks:
-                            del self.monitoring_tasks[session_id]
-                        return
-
-                await asyncio.sleep(MONITORING_INTERVAL)
+                    finally:
+                        state.sending = None
+                        if not sending.done():
+                            sending.set_result(None)
+                        # Nothing reached Telegram, so don't suppress the full dialog
+                        if (
+                            not sent
+                            and self.sessions.get(session_id) is state
+                            and state.has_simplified_dialog
+                        ):
+                            self._clear_simplified_dialog(session_id)
+                    return
 
         except asyncio.CancelledError:
             logger.debug(
                 "Monitoring cancelled",
                 session_id=session_id,
-                elapsed_time=time.time() - start_time,
+                elapsed_time=loop.time() - start_time,
                 checks_performed=check_count,
             )
             raise
@@ -332,33 +461,45 @@ class PermissionMonitor:
                 session_id=session_id,
                 error=str(e),
                 exc_info=True,
-                elapsed_time=time.time() - start_time,
+                elapsed_time=loop.time() - start_time,
                 checks_performed=check_count,
             )
 
         finally:
-            # Clean up monitoring task
-            if session_id in self.monitoring_tasks:
-                del self.monitoring_tasks[session_id]
+            # Clean up monitoring task unless a newer monitor already owns the session
+            state = self.sessions.get(session_id)
+            if state is not None and state.task is current_task:
+                state.task = None
+                self._discard_if_idle(session_id, state)
 
             logger.debug(
                 "Monitoring completed",
                 session_id=session_id,
-                total_time=time.time() - start_time,
+                total_time=loop.time() - start_time,
                 total_checks=check_count,
-                found_dialog=session_id in self.simplified_dialogs,
+                found_dialog=state is not None and state.has_simplified_dialog,
             )
 
     async def _read_tmux_content(self) -> str:
-        """Read current tmux pane content using unix socket server's method."""
+        """Read current tmux pane content using unix socket server's method.
+
+        All monitors watch the same pane, so concurrent callers share a single
+        in-flight capture.
+        """
         try:
             if not self.unix_socket_server:
                 logger.warning("No unix socket server configured")
                 return ""
 
             # Use existing method from unix socket server
-            content = await self.unix_socket_server._read_tmux_pane_content()
-            return content
+            task = self._capture_task
+            if task is None or task.done():
+                task = asyncio.ensure_future(
+                    self.unix_socket_server._read_tmux_pane_content()
+                )
+                self._capture_task = task
+            # Shielded so one cancelled monitor doesn't abort the shared capture
+            return await asyncio.shield(task)
 
         except Exception as e:
             logger.error("Failed to read tmux content", error=str(e), exc_info=True)
@@ -383,24 +524,30 @@ class PermissionMonitor:
 
     async def _send_simplified_permission(
         self, session_id: str, tool_context: Dict[str, Any], options: List[str]
-    ) -> None:
-        """Send simplified permission message with just tool name and buttons."""
+    ) -> bool:
+        """Send simplified permission message with just tool name and buttons.
+
+        Returns:
+            True if the message was handed to the conversation monitor
+        """
         try:
             if not self.conversation_monitor:
                 logger.warning("No conversation monitor configured")
-                return
+                return False
 
             tool_name = tool_context.get("tool_use", "Unknown")
 
+            # The socket server keeps tool_context for the full dialog, so copy
+            # it once instead of marking the shared dict as a preview
+            context = tool_context.copy()
+            context["permission_options"] = options
+            context["is_simplified_preview"] = True  # Mark as quick preview
+
             # Create simplified permission dialog data for immediate sending
             dialog_data = {
                 "session_id": session_id,
-                "message": f"⚡ Claude needs permission to use {tool_name}",
-                "context": {
-                    **tool_context,
-                    "permission_options": options,
-                    "is_simplified_preview": True,  # Mark as quick preview
-                },
+                "message": SIMPLIFIED_PERMISSION_MESSAGE.format(tool_name=tool_name),
+                "context": context,
                 "timestamp": time.time(),
             }
 
@@ -413,6 +560,7 @@ class PermissionMonitor:
                 tool_name=tool_name,
                 options_count=len(options),
             )
+            return True
 
         except Exception as e:
             logger.error(
@@ -421,6 +569,7 @@ class PermissionMonitor:
                 error=str(e),
                 exc_info=True,
             )
+            return False
 
     async def send_full_permission_dialog(
         self, session_id: str, full_message: str, full_context: Dict[str, Any]
@@ -439,40 +588,63 @@ class PermissionMonitor:
                 logger.warning("No conversation monitor configured")
                 return False
 
-            simplified_info = self.simplified_dialogs.get(session_id)
-
             # Cancel any active monitoring for this session (Notification arrived)
             await self.stop_monitoring(session_id)
 
+            # A monitor may still be sending its simplified dialog; wait for that
+            # send only, so the comparison below sees its final outcome
+            state = self.sessions.get(session_id)
+            if state is not None and state.sending is not None:
+                await asyncio.shield(state.sending)
+
+            # Compare and clear without awaiting so no other path interleaves
+            state = self.sessions.get(session_id)
+            simplified_info = (
+                state if state is not None and state.has_simplified_dialog else None
+            )
+
             # Check if we should skip the full dialog
             should_skip = False
             if simplified_info:
-                # Compare context hashes to detect exact same permission request
-                current_hash = self._create_permission_context_hash(full_context)
-                simplified_hash = simplified_info.get("context_hash", "")
-                user_responded = simplified_info.get("user_responded", False)
+                # Compare context hashes to detect exact same permission request.
+                # A different tool name can never hash equal, so skip hashing then.
+                simplified_hash = simplified_info.context_hash
+                user_responded = simplified_info.user_responded
+                current_tool = full_context.get("tool_use", "Unknown")
+                if current_tool != simplified_info.tool_name:
+                    current_hash = b""
+                elif full_context.get("tool_input") is simplified_info.hashed_input:
+                    # Same tool_input object the simplified dialog hashed
+                    current_hash = simplified_hash
+                else:
+                    current_hash = self._create_permission_context_hash(full_context)
 
                 # Log for debugging
                 logger.info(
                     "Comparing permission contexts",
                     session_id=session_id,
-                    current_hash=current_hash[
-                        :16
-                    ],  # Log only first 16 chars for brevity
-                    simplified_hash=simplified_hash[:16] if simplified_hash else "none",
+                    current_hash=current_hash[:8].hex() or "skipped",
+                    simplified_hash=(
+                        simplified_hash[:8].hex() if simplified_hash else "none"
+                    ),
                     hashes_match=current_hash == simplified_hash,
                     user_responded=user_responded,
-                    full_context_for_hash=full_context,  # Log full context for debugging
                 )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "Full permission context for hash",
+                        session_id=session_id,
+                        full_context_for_hash=full_context,
+                    )
 
-                if current_hash == simplified_hash:
+                if current_hash and current_hash == simplified_hash:
                     # Exact same permission request
                     should_skip = True
                     logger.info(
                         "Skipping duplicate permission dialog - already sent for this exact context",
                         session_id=session_id,
                         tool_name=full_context.get("tool_use", "Unknown"),
-                        context_hash=current_hash[:16],
+                        context_hash=current_hash[:8].hex(),
                     )
                 else:
                     # Different context (even if same tool)
@@ -480,14 +652,13 @@ class PermissionMonitor:
                         "Sending full permission dialog - different tool context",
                         session_id=session_id,
                         current_tool=full_context.get("tool_use", "Unknown"),
-                        simplified_tool=simplified_info.get("tool_name", "Unknown"),
+                        simplified_tool=simplified_info.tool_name,
                         hash_mismatch=True,
                     )
 
             if should_skip:
                 # Clean up tracking data for duplicate
-                if session_id in self.simplified_dialogs:
-                    del self.simplified_dialogs[session_id]
+                self._clear_simplified_dialog(session_id)
                 return False  # Dialog was skipped (duplicate)
 
             # Send full permission dialog using existing conversation monitor method
@@ -498,11 +669,10 @@ class PermissionMonitor:
                 "timestamp": time.time(),
             }
 
-            await self.conversation_monitor.send_permission_dialog(dialog_data)
+            # Clear before sending; a later Notification must not match it again
+            self._clear_simplified_dialog(session_id)
 
-            # Clean up tracking data after successful send
-            if session_id in self.simplified_dialogs:
-                del self.simplified_dialogs[session_id]
+            await self.conversation_monitor.send_permission_dialog(dialog_data)
 
             logger.info(
                 "Sent full permission dialog",
@@ -523,43 +693,51 @@ class PermissionMonitor:
 
     def mark_user_responded(self, session_id: str) -> None:
         """Mark that user responded to a simplified permission dialog."""
-        if session_id in self.simplified_dialogs:
-            self.simplified_dialogs[session_id]["user_responded"] = True
+        state = self.sessions.get(session_id)
+        if state is not None and state.has_simplified_dialog:
+            state.user_responded = True
             logger.info(
                 "Marked user response for simplified dialog",
                 session_id=session_id,
-                tool_name=self.simplified_dialogs[session_id].get("tool_name"),
+                tool_name=state.tool_name,
             )
 
-    def cleanup_old_sessions(self, max_age_seconds: int = 300) -> None:
+    def cleanup_old_sessions(
+        self, max_age_seconds: int = SIMPLIFIED_DIALOG_MAX_AGE
+    ) -> None:
         """Clean up old monitoring data to prevent memory leaks."""
+        if not self._dialog_heap:
+            return
+
         try:
-            current_time = time.time()
-
-            # Cancel old monitoring tasks
-            for session_id in list(self.monitoring_tasks.keys()):
-                task = self.monitoring_tasks[session_id]
-                if task.done():
-                    del self.monitoring_tasks[session_id]
-
-            # Clean up old simplified dialog tracking
-            expired_sessions = [
-                session_id
-                for session_id, info in self.simplified_dialogs.items()
-                if current_time - info.get("timestamp", 0) > max_age_seconds
-            ]
-
-            for session_id in expired_sessions:
-                del self.simplified_dialogs[session_id]
+            current_time = time.monotonic()
+
+            # Finished monitoring tasks are already released by _monitor_session
+            # and stop_monitoring, so only expired dialogs need work here. Heap
+            # entries are skipped when the dialog was cleared or replaced since.
+            cutoff = current_time - max_age_seconds
+            heap = self._dialog_heap
+            expired_count = 0
+            while heap and heap[0][0] < cutoff:
+                timestamp, session_id = heapq.heappop(heap)
+                state = self.sessions.get(session_id)
+                if (
+                    state is None
+                    or not state.has_simplified_dialog
+                    or state.timestamp != timestamp
+                ):
+                    continue
+
+                self._clear_simplified_dialog(session_id)
+                expired_count += 1
                 logger.debug(
                     "Cleaned up expired simplified dialog", session_id=session_id
                 )
 
             logger.debug(
                 "Cleanup completed",
-                active_monitors=len(self.monitoring_tasks),
-                simplified_dialogs=len(self.simplified_dialogs),
-                expired_cleaned=len(expired_sessions),
+                tracked_sessions=len(self.sessions),
+                expired_cleaned=expired_count,
             )
 
         except Exception as e:
@@ -584,7 +762,8 @@ class PermissionMonitor:
             await self.stop_monitoring(session_id)
 
             # Check if we have a simplified message - compare hashes and decide
-            if session_id in self.simplified_dialogs:
+            state = self.sessions.get(session_id)
+            if state is not None and state.has_simplified_dialog:
                 await self.send_full_permission_dialog(
                     session_id=session_id, full_message=message, full_context=context
                 )
@@ -605,5 +784,16 @@ class PermissionMonitor:
             return False
 
 
-# Global singleton instance
-permission_monitor = PermissionMonitor()
+@functools.lru_cache(maxsize=None)
+def get_permission_monitor() -> PermissionMonitor:
+    """Return the shared monitor, creating it on first use.
+
+    Used by the socket server, bot handlers and shutdown so they all see the
+    same session state.
+    """
+    return PermissionMonitor()
+
+
+def reset_permission_monitor() -> None:
+    """Forget the shared monitor so the next call builds a fresh one."""
+    get_permission_monitor.cache_clear()
@@ -1,10 +1,16 @@
 """Simple response types for Claude integration."""
 
+import sys
+
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
 
-@dataclass
+# Slotted dataclasses need Python 3.10+; older versions keep the instance dict
+_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class ClaudeResponse:
     """Response from Claude Code."""
 
@@ -18,7 +24,7 @@ class ClaudeResponse:
     tools_used: List[Dict[str, Any]] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class StreamUpdate:
     """Enhanced streaming update from Claude with richer context."""
 
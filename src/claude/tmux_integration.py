@@ -14,6 +14,9 @@ from .responses import ClaudeResponse, StreamUpdate
 
 logger = structlog.get_logger()
 
+# Hook mode has no inline result, so every successful send reports the same text
+COMMAND_SENT_CONTENT = "Command sent - response will be delivered via hooks"
+
 
 class ClaudeTmuxIntegration:
     """Claude integration for sending commands via tmux (responses delivered via hooks)."""
@@ -69,13 +72,9 @@ class ClaudeTmuxIntegration:
 
             # Create response indicating command was sent
             return ClaudeResponse(
-                content="Command sent - response will be delivered via hooks",
+                content=COMMAND_SENT_CONTENT,
                 session_id=session_id or "tmux-session",
-                cost=0.0,
                 duration_ms=duration_ms,
-                num_turns=1,
-                is_error=False,
-                tools_used=[],
             )
 
         except Exception as e:
@@ -134,12 +133,13 @@ class ClaudeTmuxIntegration:
             Status dictionary with pane information
         """
         try:
+            # get_pane_info runs the same display-message query is_pane_active
+            # would, so reaching here already means the pane is active
             pane_info = await self.tmux_client.get_pane_info()
-            is_active = await self.tmux_client.is_pane_active()
 
             return {
                 "type": "tmux",
-                "active": is_active,
+                "active": True,
                 "pane": self.tmux_client.pane_target,
                 "info": pane_info,
             }
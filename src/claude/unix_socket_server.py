@@ -1,22 +1,66 @@
 """Unix socket server for secure IPC with Claude hooks."""
 
 import asyncio
-import json
 import os
+import re
 import time
 
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
+import orjson
 import structlog
 
 from ..config.settings import Settings
 from .conversation_monitor import ConversationMonitor
-from .permission_monitor import permission_monitor
+from .permission_monitor import get_permission_monitor
 
 
 logger = structlog.get_logger()
 
+# Stop hooks for the same session arriving within this window (seconds) are
+# coalesced into a single transcript pass
+STOP_DEBOUNCE_DELAY = 0.3
+
+# Hook notifications waiting for the Telegram relay worker; beyond this the
+# newest notifications are dropped rather than letting the backlog grow
+NOTIFICATION_QUEUE_SIZE = 1024
+
+# Pane captures are reused for this long (seconds) unless input was sent since,
+# so back-to-back readers share one tmux capture-pane call
+PANE_CACHE_TTL = 0.25
+
+# Largest hook frame the socket reader will buffer (bytes). asyncio's 64 KiB
+# default is smaller than many PostToolUse payloads (file reads, bash output);
+# the limit only caps buffering, nothing is preallocated
+HOOK_FRAME_LIMIT = 8 * 1024 * 1024
+
+# Permission dialog option parsing, compiled once since the permission monitor
+# re-parses the pane on every check.
+# Numbered option, optionally inside a "│" box and/or selected with "❯":
+# "│ ❯ 1. Yes" and "│   2. Yes, and don't ask again..."
+_OPTION_RE = re.compile(r"^│?\s*❯?\s*(\d+)\.\s+(.+)")
+# Wrapped continuation of the previous option inside the dialog box
+_CONTINUATION_RE = re.compile(r"^│\s+([^❯\d].+)")
+# Trailing box drawing characters left over from the dialog border
+_TRAILING_BOX_RE = re.compile(r"[│╰╯╭╮┌┐└┘├┤┬┴┼─━═║╔╗╚╝╠╣╦╩╬]*$")
+# "❯ 1." marks a permission dialog rather than a regular numbered list
+_PERMISSION_INDICATOR_RE = re.compile(r"❯\s*\d+\.\s+")
+
+# Notification message classification, checked in this order without lowering
+_WAITING_FOR_INPUT_RE = re.compile(r"waiting for your input", re.IGNORECASE)
+_PERMISSION_WORD_RE = re.compile(r"permission", re.IGNORECASE)
+
+
+def _preview(value: Any, limit: int = 200) -> str:
+    """Short text preview of a hook value without str()-ing all of it."""
+    if isinstance(value, str):
+        return value[:limit]
+    # orjson serializes in C; slicing the bytes may split a multi-byte char
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)[
+        :limit
+    ].decode("utf-8", errors="replace")
+
 
 class UnixSocketServer:
     """Unix domain socket server for receiving Claude hook events."""
@@ -35,8 +79,31 @@ class UnixSocketServer:
         )  # session_id -> tool_context
         self.tmux_client = None  # Will be set by the facade
         self.target_cwd = None  # CWD of the Claude process we're monitoring
+        # Normalized and symlink-resolved target_cwd, computed once for the filter
+        self._target_cwd_resolved: Optional[str] = None
         # Track background tasks for proper cleanup
         self.background_tasks: List[asyncio.Task] = []
+        # session_id -> transcript task still inside its debounce window
+        self.pending_stop_tasks: Dict[str, asyncio.Task] = {}
+        # Hook notifications are relayed in order by a single worker task
+        self.notification_queue: asyncio.Queue = asyncio.Queue(
+            maxsize=NOTIFICATION_QUEUE_SIZE
+        )
+        self.notification_worker: Optional[asyncio.Task] = None
+        # hook_event_name -> handler returning the hook response
+        self._hook_handlers: Dict[
+            str, Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+        ] = {
+            "Stop": self._handle_stop,
+            "UserPromptSubmit": self._handle_user_prompt_submit,
+            "PreToolUse": self._handle_pre_tool_use,
+            "PostToolUse": self._handle_post_tool_use,
+            "Notification": self._handle_notification,
+        }
+        # (pane generation, monotonic capture time, content) of the last capture
+        self._pane_cache: Optional[Tuple[int, float, str]] = None
+        # Pane auto-discovered by the capture fallback, reused until it fails
+        self._fallback_pane: Optional[str] = None
 
     def set_tmux_client(self, tmux_client):
         """Set the tmux client reference for CWD checking."""
@@ -44,7 +111,7 @@ class UnixSocketServer:
 
     async def set_conversation_monitor(self, conversation_monitor):
         """Set the conversation monitor reference for permission monitor."""
-        await permission_monitor.configure(
+        await get_permission_monitor().configure(
             unix_socket_server=self, conversation_monitor=conversation_monitor
         )
 
@@ -58,15 +125,68 @@ class UnixSocketServer:
 
         return task
 
+    def _queue_hook_notification(self, notification: Dict[str, Any]) -> None:
+        """Hand a hook notification to the relay worker without blocking."""
+        try:
+            self.notification_queue.put_nowait(notification)
+        except asyncio.QueueFull:
+            logger.warning(
+                "Notification queue full, dropping hook notification",
+                notification_type=notification.get("type"),
+                session_id=notification.get("session_id"),
+            )
+
+    async def _run_notification_worker(self):
+        """Relay queued hook notifications to Telegram one at a time."""
+        while True:
+            notification = await self.notification_queue.get()
+            try:
+                await self.monitor.send_hook_notification(notification)
+            except Exception as e:
+                logger.error(
+                    "Failed to relay hook notification",
+                    notification_type=notification.get("type"),
+                    error=str(e),
+                )
+            finally:
+                self.notification_queue.task_done()
+
+    def _schedule_transcript_processing(self, transcript_path: str, session_id: str):
+        """Process a transcript after a short delay, replacing any pending run."""
+        pending = self.pending_stop_tasks.get(session_id)
+        if pending is not None and not pending.done():
+            pending.cancel()
+
+        self.pending_stop_tasks[session_id] = self._create_background_task(
+            self._process_transcript_debounced(transcript_path, session_id)
+        )
+
+    async def _process_transcript_debounced(
+        self, transcript_path: str, session_id: str
+    ):
+        """Wait out the debounce window, then process the transcript."""
+        await asyncio.sleep(STOP_DEBOUNCE_DELAY)
+
+        # Past the window a newer hook must not cancel us mid-parse; drop the
+        # registration unless a newer task has already replaced it
+        if self.pending_stop_tasks.get(session_id) is asyncio.current_task():
+            del self.pending_stop_tasks[session_id]
+
+        await self.monitor.process_transcript(transcript_path, session_id)
+
     async def initialize_target_cwd(self):
         """Get and store the CWD of the Claude process we're monitoring."""
         if self.tmux_client:
             try:
                 self.target_cwd = await self.tmux_client.get_pane_cwd()
+                self._target_cwd_resolved = str(
+                    Path(os.path.expanduser(self.target_cwd)).resolve()
+                )
                 logger.info(f"Initialized target CWD: {self.target_cwd}")
             except Exception as e:
                 logger.warning(f"Could not get tmux pane CWD: {e}")
                 self.target_cwd = None
+                self._target_cwd_resolved = None
 
     async def start(self):
         """Start the Unix socket server."""
@@ -89,9 +209,15 @@ class UnixSocketServer:
         # Get the target CWD before starting
         await self.initialize_target_cwd()
 
+        # Start relaying hook notifications before accepting hooks
+        if self.notification_worker is None or self.notification_worker.done():
+            self.notification_worker = self._create_background_task(
+                self._run_notification_worker()
+            )
+
         # Create Unix socket server
         self.server = await asyncio.start_unix_server(
-            self.handle_client, path=str(self.socket_path)
+            self.handle_client, path=str(self.socket_path), limit=HOOK_FRAME_LIMIT
         )
 
         # Set permissions to be restrictive (only owner can access)
@@ -107,21 +233,33 @@ class UnixSocketServer:
     ):
         """Handle incoming connections."""
         try:
-            # Read data from the socket
-            data = await reader.read(65536)  # 64KB max
+            # Hooks send newline-terminated JSON payloads; a connection may
+            # carry several frames, so keep reading until the peer hangs up
+            while not reader.at_eof():
+                try:
+                    data = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as e:
+                    # Connection closed without a newline (older hook scripts)
+                    data = e.partial
+                except asyncio.LimitOverrunError:
+                    logger.error(
+                        "Hook payload exceeds stream reader limit, dropping",
+                        limit=HOOK_FRAME_LIMIT,
+                    )
+                    return
 
-            if not data:
-                return
+                if data in (b"", b"\n"):
+                    continue
 
-            # Parse JSON data
-            try:
-                hook_data = json.loads(data.decode("utf-8"))
-            except json.JSONDecodeError as e:
-                logger.error("Invalid JSON received", error=str(e))
-                return
+                # Parse JSON data
+                try:
+                    hook_data = orjson.loads(data)
+                except orjson.JSONDecodeError as e:
+                    logger.error("Invalid JSON received", error=str(e))
+                    return
 
-            # Process the hook event (fire and forget - no response needed)
-            await self.process_hook_event(hook_data)
+                # Process the hook event (fire and forget - no response needed)
+                await self.process_hook_event(hook_data)
 
         except Exception as e:
             logger.error("Error handling client connection", error=str(e))
@@ -161,6 +299,23 @@ class UnixSocketServer:
                 truncated[key] = value
         return truncated
 
+    def _is_under_target_cwd(self, hook_cwd_normalized: str) -> bool:
+        """Check whether a normalized hook CWD is the target CWD or below it."""
+        target = self._target_cwd_resolved
+        # Plain string comparison covers the common case without touching the
+        # filesystem; joining "" appends a separator (and keeps "/" as "/")
+        if hook_cwd_normalized == target or hook_cwd_normalized.startswith(
+            os.path.join(target, "")
+        ):
+            return True
+
+        # Symlinked paths only match once resolved
+        try:
+            Path(hook_cwd_normalized).resolve().relative_to(target)
+        except ValueError:
+            return False
+        return True
+
     async def process_hook_event(self, hook_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process incoming hook event."""
         hook_type = hook_data.get("hook_event_name")
@@ -189,400 +344,386 @@ class UnixSocketServer:
             )
 
         # Check if we should process this hook based on CWD (if filtering is enabled)
-        if self.config.filter_hooks_by_cwd and self.target_cwd and hook_cwd:
-            # Normalize paths for comparison
+        if self.config.filter_hooks_by_cwd and self._target_cwd_resolved and hook_cwd:
             hook_cwd_normalized = os.path.normpath(os.path.expanduser(hook_cwd))
-            target_cwd_normalized = os.path.normpath(
-                os.path.expanduser(self.target_cwd)
-            )
 
             # Note: Claude may use cd commands, so it will change CWD during execution.
             # Check if hook_cwd is the target_cwd or a subdirectory of it
-            try:
-                # Convert to Path objects for easier comparison
-                hook_path = Path(hook_cwd_normalized).resolve()
-                target_path = Path(target_cwd_normalized).resolve()
-
-                # Check if hook_path is relative to target_path (is subdirectory or same)
-                hook_path.relative_to(target_path)
-            except ValueError:
-                # relative_to raises ValueError if hook_path is not under target_path
+            if not self._is_under_target_cwd(hook_cwd_normalized):
                 logger.info(
                     "Ignoring hook from different CWD",
                     hook_type=hook_type,
                     hook_cwd=hook_cwd_normalized,
-                    target_cwd=target_cwd_normalized,
+                    target_cwd=self._target_cwd_resolved,
                 )
                 # Return continue=True so Claude continues working
                 return {"status": "ok", "continue": True}
 
-        if hook_type == "Stop":
-            session_id = hook_data.get("session_id")
-            transcript_path = hook_data.get("transcript_path")
+        handler = self._hook_handlers.get(hook_type)
+        if handler is not None:
+            return await handler(hook_data)
 
-            # Log all hook data with truncated values
-            logger.info(
-                "Processing Stop hook",
+        # Log any other hook types we might receive
+        logger.info(
+            f"Received unhandled hook type: {hook_type}",
+            hook_type=hook_type,
+            session_id=hook_data.get("session_id", "unknown"),
+            all_params=self._truncate_params(hook_data),
+        )
+
+        # Still return continue=True for unknown hooks so Claude isn't blocked
+        return {"status": "ok", "continue": True}
+
+    async def _handle_stop(self, hook_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue transcript processing for a finished Claude turn."""
+        session_id = hook_data.get("session_id")
+        transcript_path = hook_data.get("transcript_path")
+
+        # Log all hook data with truncated values
+        logger.info(
+            "Processing Stop hook",
+            session_id=session_id,
+            transcript_path=transcript_path,
+            all_params=self._truncate_params(hook_data),
+        )
+
+        if not session_id or not transcript_path:
+            logger.error(
+                "Missing required fields",
                 session_id=session_id,
                 transcript_path=transcript_path,
-                all_params=self._truncate_params(hook_data),
             )
+            return {"status": "error", "message": "Missing required fields"}
 
-            if not session_id or not transcript_path:
-                logger.error(
-                    "Missing required fields",
-                    session_id=session_id,
-                    transcript_path=transcript_path,
-                )
-                return {"status": "error", "message": "Missing required fields"}
-
-            # Process transcript in background
-            self._create_background_task(
-                self.monitor.process_transcript(transcript_path, session_id)
-            )
+        # Process transcript in background, coalescing rapid Stop hooks
+        self._schedule_transcript_processing(transcript_path, session_id)
 
-            return {"status": "ok", "continue": True}
+        return {"status": "ok", "continue": True}
 
-        elif hook_type == "UserPromptSubmit":
-            # Handle user prompt submission
-            prompt = hook_data.get("prompt", "")
-            session_id = hook_data.get("session_id", "unknown")
+    async def _handle_user_prompt_submit(
+        self, hook_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Relay a submitted user prompt."""
+        # Handle user prompt submission
+        prompt = hook_data.get("prompt", "")
+        session_id = hook_data.get("session_id", "unknown")
 
-            # Log all hook data with truncated values
-            logger.info(
-                "Processing UserPromptSubmit hook",
-                session_id=session_id,
-                prompt_length=len(prompt),
-                prompt_preview=prompt[:200] + "..." if len(prompt) > 200 else prompt,
-                all_params=self._truncate_params(hook_data),
-            )
+        # Log all hook data with truncated values
+        logger.info(
+            "Processing UserPromptSubmit hook",
+            session_id=session_id,
+            prompt_length=len(prompt),
+            prompt_preview=prompt[:200] + "..." if len(prompt) > 200 else prompt,
+            all_params=self._truncate_params(hook_data),
+        )
 
-            # Send notification about new prompt
-            self._create_background_task(
-                self.monitor.send_hook_notification(
-                    {
-                        "type": "user_prompt",
-                        "session_id": session_id,
-                        "prompt": prompt,
-                        "timestamp": hook_data.get("timestamp"),
-                    }
-                )
-            )
+        # Send notification about new prompt
+        self._queue_hook_notification(
+            {
+                "type": "user_prompt",
+                "session_id": session_id,
+                "prompt": prompt,
+                "timestamp": hook_data.get("timestamp"),
+            }
+        )
 
-            return {"continue": True}
-
-        elif hook_type == "PreToolUse":
-            # Handle pre-tool use notification
-            tool_name = hook_data.get("tool_name", "")
-            tool_input = hook_data.get("tool_input", {})
-            session_id = hook_data.get("session_id", "unknown")
-
-            # Track this tool usage for permission dialog detection
-            self.recent_tool_usage[session_id] = time.time()
-            self._limit_dict_size(self.recent_tool_usage)
-
-            # Store tool context for fallback when transcript parsing fails
-            if tool_name in [
-                "Bash",
-                "Edit",
-                "MultiEdit",
-                "Write",
-                "Read",
-                "Glob",
-                "Grep",
-                "LS",
-                "NotebookRead",
-                "NotebookEdit",
-                "Task",
-                "TodoWrite",
-                "WebFetch",
-                "WebSearch",
-                "TodoRead",
-                "Batch",
-                "ExitPlanMode",  # Keep this one too as it might be used
-            ]:
-                self.recent_tool_context[session_id] = {
-                    "tool_use": tool_name,
-                    "tool_input": tool_input,
-                    "timestamp": time.time(),
-                }
-                self._limit_dict_size(self.recent_tool_context)
-                logger.info(
-                    "Stored tool context for fallback (PreToolUse)",
-                    session_id=session_id,
-                    tool_name=tool_name,
-                    context_keys=list(self.recent_tool_context[session_id].keys()),
-                    full_tool_input=tool_input,  # Log full tool_input for debugging
-                )
+        return {"continue": True}
 
-                # Start proactive permission monitoring
-                self._create_background_task(
-                    permission_monitor.start_monitoring(
-                        session_id=session_id,
-                        tool_context=self.recent_tool_context[session_id],
-                    )
-                )
+    async def _handle_pre_tool_use(self, hook_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Record tool context, start permission monitoring and relay the tool use."""
+        # Handle pre-tool use notification
+        tool_name = hook_data.get("tool_name", "")
+        tool_input = hook_data.get("tool_input", {})
+        session_id = hook_data.get("session_id", "unknown")
 
-            # Log all hook data with truncated values - this is the most important one for debugging
-            truncated_tool_input = (
-                self._truncate_params(tool_input)
-                if isinstance(tool_input, dict)
-                else str(tool_input)[:200]
-            )
+        # Track this tool usage for permission dialog detection
+        self.recent_tool_usage[session_id] = time.time()
+        self._limit_dict_size(self.recent_tool_usage)
 
+        # Store tool context for fallback when transcript parsing fails
+        if tool_name in [
+            "Bash",
+            "Edit",
+            "MultiEdit",
+            "Write",
+            "Read",
+            "Glob",
+            "Grep",
+            "LS",
+            "NotebookRead",
+            "NotebookEdit",
+            "Task",
+            "TodoWrite",
+            "WebFetch",
+            "WebSearch",
+            "TodoRead",
+            "Batch",
+            "ExitPlanMode",  # Keep this one too as it might be used
+        ]:
+            self.recent_tool_context[session_id] = {
+                "tool_use": tool_name,
+                "tool_input": tool_input,
+                "timestamp": time.time(),
+            }
+            self._limit_dict_size(self.recent_tool_context)
             logger.info(
-                "Processing PreToolUse hook",
+                "Stored tool context for fallback (PreToolUse)",
                 session_id=session_id,
                 tool_name=tool_name,
-                tool_input_keys=(
-                    list(tool_input.keys())
-                    if isinstance(tool_input, dict)
-                    else "non-dict"
-                ),
-                tool_input_truncated=truncated_tool_input,
-                all_params=self._truncate_params(hook_data),
+                context_keys=list(self.recent_tool_context[session_id].keys()),
+                full_tool_input=tool_input,  # Log full tool_input for debugging
             )
 
-            # Send notification about tool use
+            # Start proactive permission monitoring
             self._create_background_task(
-                self.monitor.send_hook_notification(
-                    {
-                        "type": "pre_tool_use",
-                        "session_id": session_id,
-                        "tool_name": tool_name,
-                        "parameters": tool_input,  # Pass tool_input as parameters
-                        "timestamp": hook_data.get("timestamp"),
-                    }
+                get_permission_monitor().start_monitoring(
+                    session_id=session_id,
+                    tool_context=self.recent_tool_context[session_id],
                 )
             )
 
-            return {"continue": True}
+        # Log all hook data with truncated values - this is the most important one for debugging
+        truncated_tool_input = (
+            self._truncate_params(tool_input)
+            if isinstance(tool_input, dict)
+            else str(tool_input)[:200]
+        )
+
+        logger.info(
+            "Processing PreToolUse hook",
+            session_id=session_id,
+            tool_name=tool_name,
+            tool_input_keys=(
+                list(tool_input.keys()) if isinstance(tool_input, dict) else "non-dict"
+            ),
+            tool_input_truncated=truncated_tool_input,
+            all_params=self._truncate_params(hook_data),
+        )
+
+        # Send notification about tool use
+        self._queue_hook_notification(
+            {
+                "type": "pre_tool_use",
+                "session_id": session_id,
+                "tool_name": tool_name,
+                "parameters": tool_input,  # Pass tool_input as parameters
+                "timestamp": hook_data.get("timestamp"),
+            }
+        )
 
-        elif hook_type == "PostToolUse":
-            # Handle post-tool use notification
-            tool_name = hook_data.get("tool_name", "")
-            tool_response = hook_data.get("tool_response", {})
-            tool_input = hook_data.get("tool_input", {})
-            session_id = hook_data.get("session_id", "unknown")
+        return {"continue": True}
+
+    async def _handle_post_tool_use(self, hook_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Relay a tool result."""
+        # Handle post-tool use notification
+        tool_name = hook_data.get("tool_name", "")
+        tool_response = hook_data.get("tool_response", {})
+        tool_input = hook_data.get("tool_input", {})
+        session_id = hook_data.get("session_id", "unknown")
+
+        # Log all hook data with truncated values
+        truncated_tool_input = (
+            self._truncate_params(tool_input)
+            if isinstance(tool_input, dict)
+            else str(tool_input)[:200]
+        )
+        truncated_tool_response = (
+            self._truncate_params(tool_response)
+            if isinstance(tool_response, dict)
+            else _preview(tool_response)
+        )
 
-            # Log all hook data with truncated values
-            truncated_tool_input = (
-                self._truncate_params(tool_input)
-                if isinstance(tool_input, dict)
-                else str(tool_input)[:200]
-            )
-            truncated_tool_response = (
-                self._truncate_params(tool_response)
+        logger.info(
+            "Processing PostToolUse hook",
+            session_id=session_id,
+            tool_name=tool_name,
+            has_response=bool(tool_response),
+            response_keys=(
+                list(tool_response.keys())
                 if isinstance(tool_response, dict)
-                else str(tool_response)[:200]
-            )
+                else "non-dict"
+            ),
+            tool_input_truncated=truncated_tool_input,
+            tool_response_truncated=truncated_tool_response,
+            all_params=self._truncate_params(hook_data),
+        )
 
-            logger.info(
-                "Processing PostToolUse hook",
-                session_id=session_id,
-                tool_name=tool_name,
-                has_response=bool(tool_response),
-                response_keys=(
-                    list(tool_response.keys())
-                    if isinstance(tool_response, dict)
-                    else "non-dict"
-                ),
-                tool_input_truncated=truncated_tool_input,
-                tool_response_truncated=truncated_tool_response,
-                all_params=self._truncate_params(hook_data),
-            )
+        # Send notification about tool result
+        self._queue_hook_notification(
+            {
+                "type": "post_tool_use",
+                "session_id": session_id,
+                "tool_name": tool_name,
+                "parameters": tool_input,  # Include original parameters
+                "result_preview": _preview(tool_response) if tool_response else None,
+                "tool_response": tool_response,  # Pass full response
+                "timestamp": hook_data.get("timestamp"),
+            }
+        )
 
-            # Send notification about tool result
-            self._create_background_task(
-                self.monitor.send_hook_notification(
-                    {
-                        "type": "post_tool_use",
-                        "session_id": session_id,
-                        "tool_name": tool_name,
-                        "parameters": tool_input,  # Include original parameters
-                        "result_preview": (
-                            str(tool_response)[:200] if tool_response else None
-                        ),
-                        "tool_response": tool_response,  # Pass full response
-                        "timestamp": hook_data.get("timestamp"),
-                    }
-                )
-            )
+        return {"continue": True}
 
-            return {"continue": True}
+    async def _handle_notification(self, hook_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Route a notification to the permission flow or relay it as-is."""
+        # Handle Claude notification events (including permission dialogs)
+        message = hook_data.get("message", "")
+        session_id = hook_data.get("session_id", "unknown")
+        transcript_path = hook_data.get("transcript_path", "")
 
-        elif hook_type == "Notification":
-            # Handle Claude notification events (including permission dialogs)
-            message = hook_data.get("message", "")
-            session_id = hook_data.get("session_id", "unknown")
-            transcript_path = hook_data.get("transcript_path", "")
+        # First, notify permission monitor to stop monitoring and possibly update message
+        permission_monitor = get_permission_monitor()
+        monitor_handled_dialog = await permission_monitor.handle_notification_hook(
+            session_id=session_id,
+            message=message,
+            context=self.recent_tool_context.get(session_id, {}),
+        )
 
-            # First, notify permission monitor to stop monitoring and possibly update message
-            monitor_handled_dialog = await permission_monitor.handle_notification_hook(
-                session_id=session_id,
-                message=message,
-                context=self.recent_tool_context.get(session_id, {}),
-            )
+        # Detailed logging for permission dialog analysis (replaces truncated logging above)
+        logger.info(
+            "Processing Notification hook",
+            session_id=session_id,
+            full_message=message,  # Complete message for pattern analysis
+            message_type=(
+                "permission_request"
+                if _PERMISSION_WORD_RE.search(message)
+                else (
+                    "idle_timeout"
+                    if _WAITING_FOR_INPUT_RE.search(message)
+                    else "unknown_notification"
+                )
+            ),
+            transcript_path=transcript_path,
+            has_recent_tool_usage=session_id in self.recent_tool_usage,
+            recent_tool_context=self.recent_tool_context.get(session_id, {}),
+            dialog_handled_by_monitor=monitor_handled_dialog,
+        )
 
-            # Detailed logging for permission dialog analysis (replaces truncated logging above)
+        # Check if this is a permission dialog based on message content
+        # Skip processing if permission monitor already handled it
+        if not monitor_handled_dialog and self._is_permission_dialog(
+            session_id, message
+        ):
             logger.info(
-                "Processing Notification hook",
+                "PERMISSION_DIALOG_DETECTED",  # Make it easy to grep for these
                 session_id=session_id,
-                full_message=message,  # Complete message for pattern analysis
-                message_type=(
-                    "permission_request"
-                    if "permission" in message.lower()
-                    else (
-                        "idle_timeout"
-                        if "waiting for your input" in message.lower()
-                        else "unknown_notification"
-                    )
+                full_permission_message=message,
+                recent_tool_used=self.recent_tool_context.get(session_id, {}).get(
+                    "tool_use", "unknown"
+                ),
+                tool_context_full=self.recent_tool_context.get(session_id, {}),
+                notification_hook_data=hook_data,  # Complete hook data
+                detection_method=(
+                    "message_content"
+                    if _PERMISSION_WORD_RE.search(message)
+                    else "recent_tool_timing"
                 ),
-                transcript_path=transcript_path,
-                has_recent_tool_usage=session_id in self.recent_tool_usage,
-                recent_tool_context=self.recent_tool_context.get(session_id, {}),
-                dialog_handled_by_monitor=monitor_handled_dialog,
             )
 
-            # Check if this is a permission dialog based on message content
-            # Skip processing if permission monitor already handled it
-            if not monitor_handled_dialog and self._is_permission_dialog(
-                session_id, message
-            ):
-                logger.info(
-                    "PERMISSION_DIALOG_DETECTED",  # Make it easy to grep for these
-                    session_id=session_id,
-                    full_permission_message=message,
-                    recent_tool_used=self.recent_tool_context.get(session_id, {}).get(
-                        "tool_use", "unknown"
-                    ),
-                    tool_context_full=self.recent_tool_context.get(session_id, {}),
-                    notification_hook_data=hook_data,  # Complete hook data
-                    detection_method=(
-                        "message_content"
-                        if "permission" in message.lower()
-                        else "recent_tool_timing"
-                    ),
-                )
+            # Extract tool name from permission message (last word)
+            permission_tool_name = self._extract_tool_name_from_permission_message(
+                message
+            )
 
-                # Extract tool name from permission message (last word)
-                permission_tool_name = self._extract_tool_name_from_permission_message(
-                    message
+            if permission_tool_name:
+                # Try to find the most recent matching tool context
+                context = self._find_matching_tool_context(
+                    session_id, permission_tool_name
                 )
 
-                if permission_tool_name:
-                    # Try to find the most recent matching tool context
-                    context = self._find_matching_tool_context(
-                        session_id, permission_tool_name
+                if context:
+                    logger.info(
+                        "Found matching tool context for permission dialog (Notification)",
+                        session_id=session_id,
+                        permission_tool=permission_tool_name,
+                        actual_tool=context.get("tool_use"),
+                        tool_input_keys=list(context.get("tool_input", {}).keys()),
+                        full_tool_input=context.get(
+                            "tool_input"
+                        ),  # Log full tool_input for debugging
                     )
-
-                    if context:
-                        logger.info(
-                            "Found matching tool context for permission dialog (Notification)",
-                            session_id=session_id,
-                            permission_tool=permission_tool_name,
-                            actual_tool=context.get("tool_use"),
-                            tool_input_keys=list(context.get("tool_input", {}).keys()),
-                            full_tool_input=context.get(
-                                "tool_input"
-                            ),  # Log full tool_input for debugging
-                        )
-                    else:
-                        # Fallback to most recent context
-                        recent_context = self.recent_tool_context.get(session_id, {})
-                        if recent_context:
-                            context = recent_context
-                            logger.warning(
-                                "No matching tool found for permission dialog, using most recent",
-                                session_id=session_id,
-                                permission_tool=permission_tool_name,
-                                recent_tool=recent_context.get("tool_use"),
-                            )
-                        else:
-                            logger.warning(
-                                "No tool context available for permission dialog",
-                                session_id=session_id,
-                                permission_tool=permission_tool_name,
-                            )
-                            # Create minimal context with just the tool name so dialog can still be sent
-                            context = {
-                                "tool_use": permission_tool_name,
-                                "tool_input": {},
-                                "timestamp": time.time(),
-                            }
                 else:
-                    # Can't parse tool name, use recent context
+                    # Fallback to most recent context
                     recent_context = self.recent_tool_context.get(session_id, {})
                     if recent_context:
                         context = recent_context
                         logger.warning(
-                            "Could not parse tool from permission message, using recent context",
+                            "No matching tool found for permission dialog, using most recent",
                             session_id=session_id,
-                            tool_name=recent_context.get("tool_use"),
+                            permission_tool=permission_tool_name,
+                            recent_tool=recent_context.get("tool_use"),
                         )
                     else:
                         logger.warning(
                             "No tool context available for permission dialog",
                             session_id=session_id,
+                            permission_tool=permission_tool_name,
                         )
-                        # Create minimal context for unknown tool so dialog can still be sent
+                        # Create minimal context with just the tool name so dialog can still be sent
                         context = {
-                            "tool_use": "Unknown",
+                            "tool_use": permission_tool_name,
                             "tool_input": {},
                             "timestamp": time.time(),
                         }
-
-                # Read tmux pane to get actual permission options
-                tmux_content = await self._read_tmux_pane_content()
-                permission_options = self._parse_permission_options(tmux_content)
-
-                # Add options to context
-                context["permission_options"] = permission_options
-
-                logger.info(
-                    "Permission context extracted",
-                    context=context,
-                    message=message,
-                    transcript_path=transcript_path,
-                )
-
-                # Send permission dialog to Telegram via permission monitor
-                await permission_monitor.send_full_permission_dialog(
-                    session_id=session_id, full_message=message, full_context=context
-                )
             else:
-                # Idle timeout or other notification (no recent tool usage)
-                logger.info(
-                    "Processing idle timeout or regular notification",
-                    message=message,
-                    session_id=session_id,
-                )
-                self._create_background_task(
-                    self.monitor.send_hook_notification(
-                        {
-                            "type": "notification",
-                            "session_id": session_id,
-                            "message": message,
-                            "timestamp": hook_data.get("timestamp"),
-                        }
+                # Can't parse tool name, use recent context
+                recent_context = self.recent_tool_context.get(session_id, {})
+                if recent_context:
+                    context = recent_context
+                    logger.warning(
+                        "Could not parse tool from permission message, using recent context",
+                        session_id=session_id,
+                        tool_name=recent_context.get("tool_use"),
                     )
-                )
+                else:
+                    logger.warning(
+                        "No tool context available for permission dialog",
+                        session_id=session_id,
+                    )
+                    # Create minimal context for unknown tool so dialog can still be sent
+                    context = {
+                        "tool_use": "Unknown",
+                        "tool_input": {},
+                        "timestamp": time.time(),
+                    }
 
-            # Clean up old tool usage entries periodically
-            self._cleanup_old_tool_usage()
+            # Read tmux pane to get actual permission options
+            tmux_content = await self._read_tmux_pane_content(fresh=True)
+            permission_options = self._parse_permission_options(tmux_content)
 
-            return {"continue": True}
+            # Add options to context
+            context["permission_options"] = permission_options
 
-        # Log any other hook types we might receive
-        logger.info(
-            f"Received unhandled hook type: {hook_type}",
-            hook_type=hook_type,
-            session_id=hook_data.get("session_id", "unknown"),
-            all_params=self._truncate_params(hook_data),
-        )
+            logger.info(
+                "Permission context extracted",
+                context=context,
+                message=message,
+                transcript_path=transcript_path,
+            )
 
-        # Still return continue=True for unknown hooks so Claude isn't blocked
-        return {"status": "ok", "continue": True}
+            # Send permission dialog to Telegram via permission monitor
+            await get_permission_monitor().send_full_permission_dialog(
+                session_id=session_id, full_message=message, full_context=context
+            )
+        else:
+            # Idle timeout or other notification (no recent tool usage)
+            logger.info(
+                "Processing idle timeout or regular notification",
+                message=message,
+                session_id=session_id,
+            )
+            self._queue_hook_notification(
+                {
+                    "type": "notification",
+                    "session_id": session_id,
+                    "message": message,
+                    "timestamp": hook_data.get("timestamp"),
+                }
+            )
+
+        # Clean up old tool usage entries periodically
+        self._cleanup_old_tool_usage()
+
+        return {"continue": True}
 
     def _is_permission_dialog(self, session_id: str, message: str = "") -> bool:
         """Check if a notification is a permission dialog based on message content and context.
@@ -591,10 +732,9 @@ class UnixSocketServer:
         Idle timeout notifications occur when there's no recent tool usage.
         """
         # First check message content for clear indicators
-        message_lower = message.lower()
 
         # If message says "waiting for your input", it's NOT a permission dialog
-        if "waiting for your input" in message_lower:
+        if _WAITING_FOR_INPUT_RE.search(message):
             logger.info(
                 "Not a permission dialog - Claude is waiting for input",
                 session_id=session_id,
@@ -603,7 +743,7 @@ class UnixSocketServer:
             return False
 
         # If message contains "permission", it IS a permission dialog
-        if "permission" in message_lower:
+        if _PERMISSION_WORD_RE.search(message):
             logger.info(
                 "Permission dialog detected by message content",
                 session_id=session_id,
@@ -750,13 +890,31 @@ class UnixSocketServer:
             del self.recent_tool_context[session_id]
             logger.debug("Cleaned up old tool context entry", session_id=session_id)
 
-    async def _read_tmux_pane_content(self) -> str:
-        """Read current tmux pane content to extract permission options."""
+    async def _read_tmux_pane_content(self, fresh: bool = False) -> str:
+        """Read current tmux pane content to extract permission options.
+
+        Args:
+            fresh: Always capture instead of reusing a recent capture. Claude
+                draws dialogs without any input being sent, so a cached
+                capture may predate the dialog a Notification refers to.
+        """
         try:
             # Use the shared tmux client from facade instead of doing separate discovery
             if self.tmux_client:
+                # Reuse a fresh capture if no input was sent to the pane since
+                generation = self.tmux_client.pane_generation
+                cache = self._pane_cache
+                if (
+                    not fresh
+                    and cache is not None
+                    and cache[0] == generation
+                    and time.monotonic() - cache[1] < PANE_CACHE_TTL
+                ):
+                    return cache[2]
+
                 # Use the same pane that the facade is using
                 content = await self.tmux_client.capture_output(lines=50)
+                self._pane_cache = (generation, time.monotonic(), content)
                 logger.info(
                     "Captured tmux pane content via shared client",
                     target_pane=self.tmux_client.pane_target,
@@ -775,17 +933,32 @@ class UnixSocketServer:
             try:
                 from src.tmux.client import TmuxClient
 
-                # Use configured pane or auto-discover
+                # Use configured pane, the last discovered one, or auto-discover
+                reused_pane = False
                 if self.config.pane:
                     target_pane = self.config.pane.strip()
                     logger.info("Using configured pane for fallback", pane=target_pane)
+                elif self._fallback_pane:
+                    target_pane = self._fallback_pane
+                    reused_pane = True
                 else:
                     target_pane = await TmuxClient.discover_claude_pane()
+                    self._fallback_pane = target_pane
                     logger.info("Auto-discovered pane for fallback", pane=target_pane)
 
                 # Create temporary client and capture content
-                temp_client = TmuxClient(target_pane)
-                content = await temp_client.capture_output(lines=50)
+                try:
+                    content = await TmuxClient(target_pane).capture_output(lines=50)
+                except Exception:
+                    if not reused_pane:
+                        raise
+                    # Previously discovered pane may be gone; look it up again once
+                    self._fallback_pane = None
+                    target_pane = await TmuxClient.discover_claude_pane()
+                    self._fallback_pane = target_pane
+                    logger.info("Re-discovered pane for fallback", pane=target_pane)
+                    content = await TmuxClient(target_pane).capture_output(lines=50)
+
                 logger.info(
                     "Captured tmux pane content via fallback client",
                     target_pane=target_pane,
@@ -889,8 +1062,6 @@ class UnixSocketServer:
         current_list = []
         current_option_text = ""
 
-        import re
-
         for line in lines:
             stripped = line.strip()
 
@@ -899,8 +1070,7 @@ class UnixSocketServer:
                 continue
 
             # Check if line starts with optional "│" then optional "❯ " followed by number, dot and space
-            # Handles: "│ ❯ 1. Yes" and "│   2. Yes, and don't ask again..."
-            match = re.match(r"^│?\s*❯?\s*(\d+)\.\s+(.+)", stripped)
+            match = _OPTION_RE.match(stripped)
 
             if match:
                 # If we were building a multi-line option, save it
@@ -910,7 +1080,7 @@ class UnixSocketServer:
                 number = int(match.group(1))
                 text = match.group(2).strip()
                 # Remove trailing box drawing characters and other unwanted chars
-                text = re.sub(r"[│╰╯╭╮┌┐└┘├┤┬┴┼─━═║╔╗╚╝╠╣╦╩╬]*$", "", text).strip()
+                text = _TRAILING_BOX_RE.sub("", text).strip()
 
                 # If this is number 1, start a new list
                 if number == 1:
@@ -928,12 +1098,12 @@ class UnixSocketServer:
                 # Check if this line is a continuation of the previous option
                 # (e.g., wrapped text from a long option)
                 # Look for lines that start with "│   " (continuation) but not "│ ❯" or "│   N." (new options)
-                continuation_match = re.match(r"^│\s+([^❯\d].+)", stripped)
+                continuation_match = _CONTINUATION_RE.match(stripped)
                 if current_list and current_option_text and continuation_match:
                     continuation_text = continuation_match.group(1).strip()
                     # Remove trailing box drawing characters
-                    continuation_text = re.sub(
-                        r"[│╰╯╭╮┌┐└┘├┤┬┴┼─━═║╔╗╚╝╠╣╦╩╬]*$", "", continuation_text
+                    continuation_text = _TRAILING_BOX_RE.sub(
+                        "", continuation_text
                     ).strip()
                     current_option_text += " " + continuation_text
                 else:
@@ -952,7 +1122,7 @@ class UnixSocketServer:
             # Check if any line in the original content has "❯ 1." pattern
             # This indicates it's a permission dialog, not a regular numbered list
             has_permission_indicator = any(
-                "❯" in line and re.match(r".*❯\s*\d+\.\s+", line) for line in lines
+                "❯" in line and _PERMISSION_INDICATOR_RE.search(line) for line in lines
             )
 
             if has_permission_indicator:
@@ -1024,6 +1194,8 @@ class UnixSocketServer:
                 logger.warning("Some background tasks did not complete within timeout")
 
         self.background_tasks.clear()
+        self.pending_stop_tasks.clear()
+        self.notification_worker = None
 
         # Remove socket file
         if self.socket_path.exists():
@@ -385,9 +385,9 @@ async def run_application(app: Dict[str, Any]) -> int:
             await claude_integration.shutdown()
 
             # Clean up permission monitor
-            from .claude.permission_monitor import permission_monitor
+            from .claude.permission_monitor import get_permission_monitor
 
-            await permission_monitor.shutdown()
+            await get_permission_monitor().shutdown()
 
             # Clean up socket server
             if socket_server:
@@ -463,8 +463,19 @@ async def main() -> None:
         sys.exit(1)
 
 
+def install_event_loop_policy() -> None:
+    """Use uvloop for the event loop when it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
 def run() -> None:
     """Synchronous entry point for setuptools."""
+    install_event_loop_policy()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -12,6 +12,10 @@ from src.tmux.exceptions import TmuxCommandError, TmuxPaneNotFoundError
 
 logger = structlog.get_logger()
 
+# Upper bound (seconds) for a single tmux invocation so a wedged tmux server
+# can't stall the hook handlers waiting on a capture
+TMUX_COMMAND_TIMEOUT = 5.0
+
 
 class TmuxClient:
     """Client for communicating with tmux panes."""
@@ -23,6 +27,8 @@ class TmuxClient:
             pane_target: tmux pane target in format "session:window.pane"
         """
         self.pane_target = pane_target
+        # Bumped whenever input is sent so cached captures can be invalidated
+        self.pane_generation = 0
 
     @staticmethod
     async def discover_claude_pane() -> str:
@@ -247,7 +253,16 @@ class TmuxClient:
             proc = await asyncio.create_subprocess_exec(
                 *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
             )
-            stdout, stderr = await proc.communicate()
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    proc.communicate(), timeout=TMUX_COMMAND_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise TmuxCommandError(
+                    f"tmux {args[0]} timed out after {TMUX_COMMAND_TIMEOUT}s"
+                ) from None
 
             if proc.returncode != 0:
                 error_msg = stderr.decode().strip()
@@ -256,6 +271,8 @@ class TmuxClient:
             return stdout.decode().strip()
         except FileNotFoundError as e:
             raise TmuxCommandError("tmux command not found. Is tmux installed?") from e
+        except TmuxCommandError:
+            raise
         except Exception as e:
             raise TmuxCommandError(f"Failed to execute tmux command: {e}") from e
 
@@ -268,6 +285,7 @@ class TmuxClient:
         Raises:
             TmuxCommandError: If sending fails
         """
+        self.pane_generation += 1
         await self._run_tmux_command(["send-keys", "-t", self.pane_target, text])
 
         await asyncio.sleep(0.2)
@@ -282,6 +300,7 @@ class TmuxClient:
             TmuxCommandError: If sending fails
         """
         # Send the Escape key directly without Enter
+        self.pane_generation += 1
         await self._run_tmux_command(["send-keys", "-t", self.pane_target, "Escape"])
 
     async def capture_output(self, lines: int = 100) -> str: